@@ -11,8 +11,28 @@ __author__ = "Garance Gourdel, Pierre Peterlongo"
 __email__ = "pierre.peterlongo@inria.fr, garance.gourdel@inria.fr"
 
 import sys
+from bisect import bisect_left
 
-from .block import Block
+from .block import Block, IntervalBlock
+from .runs import RunLengthSequence
+
+
+class BorderBlock:
+    """Pseudo block standing for the line above or the column on the left of the matrix
+
+    Only defines what neighbouring blocks read: bottom left and top right values,
+    bottom right value (read by the South-East block), bottom and right cuts.
+    """
+
+    def __init__(self, bl, tr, br, bottom_cuts, rightmost_cuts):
+        self.bl = bl
+        self.tr = tr
+        self.br = br
+        self.bottom_cuts = bottom_cuts
+        self.rightmost_cuts = rightmost_cuts
+
+    def __repr__(self):
+        return f" border bl = {self.bl}, tr = {self.tr}, br = {self.br}\n"
 
 
 class DtwByBlocks:
@@ -20,7 +40,19 @@ class DtwByBlocks:
     Computes the DTW matrix for a pattern P and a text T in O(#runsP |T| + |P| #runsT) time and space.
     """
 
-    def __init__(self, P, T, max_value=sys.maxsize):
+    modes = ("matrix", "last_row", "distance")
+    boundaries = ("pattern_matching", "global", "semi_global")
+
+    def __init__(
+        self,
+        P,
+        T,
+        max_value=sys.maxsize,
+        cut_intervals=False,
+        mode="matrix",
+        boundary="pattern_matching",
+        previous=None,
+    ):
         """Init and compute a DTW matrix
 
         Computes only borders of blocks (a block is computed for each a^height of P versus b^width of T)
@@ -28,14 +60,39 @@ class DtwByBlocks:
 
         Here a match is considered a 0 and a mismatch as 1.
         Args:
-            P ([str]): Pattern string -> vertical in the matrix
-            T ([str]): target string -> horizontal in the matrix
+            P ([str] or RunLengthSequence): Pattern string -> vertical in the matrix
+            T ([str] or RunLengthSequence): target string -> horizontal in the matrix,
+                run-length encoded sequences are used as is, without scanning their letters
             max_value (int): maximal value to be computed in the matrix
+            cut_intervals (bool): cuts are stored as lists of (start, length) intervals (see IntervalBlock)
+            mode (str): "matrix" keeps every block in self.block_matrix (for debugging and __repr__),
+                "last_row" only keeps the previous column of blocks while computing,
+                and the last row of blocks (needed for occurrences),
+                "distance" only keeps the previous column of blocks while computing,
+                in O(#runsP) memory, and the last column of blocks afterwards
+            boundary (str): values of the line above and of the column on the left of the matrix,
+                "pattern_matching": 0 above, infinite on the left (an occurrence of P may start anywhere in T),
+                "global": i on line i and j on column j, as DynamicMatrix.initGlobal_DTW
+                with a gap of 1 (end-to-end DTW, see get_br_value),
+                "semi_global": 0 above and on the left, for overlaps (see best_ends_free_value)
+            previous (DtwByBlocks): optional: the same matrix computed in matrix mode with a
+                lower max_value, its blocks whose values are all lower than its max_value
+                are exact and are reused instead of being computed again
         """
+        if mode not in self.modes:
+            raise ValueError(f"Unknown mode {mode}, expected one of {self.modes}")
+        if boundary not in self.boundaries:
+            raise ValueError(
+                f"Unknown boundary {boundary}, expected one of {self.boundaries}"
+            )
 
         self.P = P
         self.T = T
         self.max_value = max_value
+        self.cut_intervals = cut_intervals
+        self.block_class = IntervalBlock if cut_intervals else Block
+        self.mode = mode
+        self.boundary = boundary
         #      T
         #  --------
         #  |
@@ -43,27 +100,110 @@ class DtwByBlocks:
         #  |
 
         # Determine block positions:
-        # list of vertical frontiers:
-        self.end_vertical_blocks = []
-        for i in range(1, len(self.T)):
-            if self.T[i] != self.T[i - 1]:
-                self.end_vertical_blocks.append(i - 1)
-        self.end_vertical_blocks.append(len(self.T) - 1)
-
-        # list of horizontal frontiers:
-        self.end_horizontal_blocks = []
-        for i in range(1, len(self.P)):
-            if self.P[i] != self.P[i - 1]:
-                self.end_horizontal_blocks.append(i - 1)
-        self.end_horizontal_blocks.append(len(self.P) - 1)
+        # list of vertical frontiers (and the letter of each run of T):
+        self.end_vertical_blocks, self.T_letters = self.__runs__(self.T)
+
+        # list of horizontal frontiers (and the letter of each run of P):
+        self.end_horizontal_blocks, self.P_letters = self.__runs__(self.P)
 
         # Future array of blocks:
-        self.block_matrix = [[] for i in range(len(self.end_horizontal_blocks))]
-        for i in range(len(self.end_horizontal_blocks)):
-            self.block_matrix[i] = [None for j in range(len(self.end_vertical_blocks))]
+        self.block_matrix = None
+        if self.mode == "matrix":
+            self.block_matrix = [[] for i in range(len(self.end_horizontal_blocks))]
+            for i in range(len(self.end_horizontal_blocks)):
+                self.block_matrix[i] = [
+                    None for j in range(len(self.end_vertical_blocks))
+                ]
+        # Last column of blocks, available in any mode once computed
+        self.last_column = None
+        # Pseudo blocks on the left of the matrix (kept in matrix mode)
+        self.left_border = None
+        # Last row of blocks, one per run of T (not kept in distance mode)
+        self.last_row = None if self.mode == "distance" else []
+
+        # Blocks whose input values are all saturated (>= max_value) are not computed:
+        # they are None in columns and read as saturated_border by their neighbours.
+        self.saturated_border = BorderBlock(
+            bl=max_value, tr=max_value, br=max_value, bottom_cuts=[], rightmost_cuts=[]
+        )
+        self.nb_computed_blocks = 0
+        self.nb_reused_blocks = 0
+        self.previous = previous
+        # index of the last block of the previous column which is not saturated
+        self.last_active = -1
 
         # Compute the blocks:
         self.__compute_blocks__()
+        self.previous = None
+
+    @classmethod
+    def from_rle(cls, P_letters, P_lengths, T_letters, T_lengths, **kwargs):
+        """DTW matrix of run-length encoded P and T
+
+        Args:
+            P_letters, P_lengths: letter and length of each run of P (see RunLengthSequence)
+            T_letters, T_lengths: letter and length of each run of T
+            kwargs: other arguments of DtwByBlocks (max_value, cut_intervals, mode, boundary)
+        """
+        return cls(
+            RunLengthSequence(P_letters, P_lengths),
+            RunLengthSequence(T_letters, T_lengths),
+            **kwargs,
+        )
+
+    @classmethod
+    def iterative_deepening(cls, P, T, max_value=8, target="br", **kwargs):
+        """Exact DTW matrix computed with the small distance fast path
+
+        The matrix is computed with max_value, then 2 max_value, 4 max_value...
+        until the target value is lower than max_value (and thus exact). Each
+        computation reuses the exact blocks of the previous one.
+        Every computation is in matrix mode.
+
+        Args:
+            max_value (int): first max_value
+            target (str): "br" (get_br_value) or "best_occurrence" (its distance)
+            kwargs: other arguments of DtwByBlocks (cut_intervals, boundary)
+
+        Returns:
+            DtwByBlocks: the last computation, whose target value is exact
+        """
+        if target not in ("br", "best_occurrence"):
+            raise ValueError(
+                f"Unknown target {target}, expected br or best_occurrence"
+            )
+        if max_value < 1:
+            raise ValueError(f"The first max_value must be positive, not {max_value}")
+        previous = None
+        while True:
+            dtw = cls(P, T, max_value, mode="matrix", previous=previous, **kwargs)
+            if target == "br":
+                value = dtw.get_br_value()
+            else:
+                value = dtw.best_occurrence()[0]
+            if value < max_value:
+                return dtw
+            previous = dtw
+            max_value *= 2
+
+    @staticmethod
+    def __runs__(S):
+        """Runs of a sequence
+
+        Args:
+            S (str or RunLengthSequence): a sequence
+
+        Returns:
+            (list<int>, list): end position and letter of each run
+        """
+        if isinstance(S, RunLengthSequence):
+            return S.ends, S.letters
+        ends = []
+        for i in range(1, len(S)):
+            if S[i] != S[i - 1]:
+                ends.append(i - 1)
+        ends.append(len(S) - 1)
+        return ends, [S[end] for end in ends]
 
     def __repr__(self):
         """Provides a string view of all blocks
@@ -77,93 +217,554 @@ class DtwByBlocks:
         res += f"end_vertical_blocks: {self.end_vertical_blocks}\n"
         res += f"end_horizontal_blocks: {self.end_horizontal_blocks}\n"
 
-        res += f"bottom right value {self.block_matrix[-1][-1].br}\n"
+        res += f"bottom right value {self.get_br_value()}\n"
 
+        if self.block_matrix is None:
+            res += f"Blocks are not kept in {self.mode} mode\n"
+            return res
         for h_block_id in range(len(self.end_vertical_blocks)):
             for v_block_id in range(len(self.end_horizontal_blocks)):
-                res += f"*** Block {v_block_id} {h_block_id} ***\n{self.block_matrix[v_block_id][h_block_id]}\n"
+                block = self.block_matrix[v_block_id][h_block_id]
+                if block is None:
+                    block = " saturated, not computed\n"
+                res += f"*** Block {v_block_id} {h_block_id} ***\n{block}\n"
         return res
 
     def get_br_value(self):
-        return self.block_matrix[-1][-1].br
+        if (
+            len(self.last_column) < len(self.end_horizontal_blocks)
+            or self.last_column[-1] is None
+        ):
+            return self.max_value  # last block was skipped, saturated
+        return self.last_column[-1].br
 
     def get_nb_blocks(self):
         return len(self.end_horizontal_blocks) * len(self.end_vertical_blocks)
 
+    def get_nb_skipped_blocks(self):
+        """Number of blocks not computed because all their input values are saturated"""
+        return self.get_nb_blocks() - self.nb_computed_blocks - self.nb_reused_blocks
+
+    def __check_last_row__(self):
+        if self.last_row is None:
+            raise ValueError(f"The last row of blocks is not kept in {self.mode} mode")
+
+    def __last_row_blocks__(self):
+        """Iterates over the last row of blocks
+
+        Yields:
+            (int, int, Block): first and last column of the block and the block,
+                None if it was skipped (saturated)
+        """
+        self.__check_last_row__()
+        col_start = 0
+        for col_end, block in zip(self.end_vertical_blocks, self.last_row):
+            yield col_start, col_end, block
+            col_start = col_end + 1
+
+    def get_last_row(self):
+        """DTW distance of the best occurrence of P ending at each position of T
+
+        Values larger than or equal to max_value are reported as max_value.
+        Returns:
+            list<int>: |T| values, the i-th one for an occurrence ending at T[i]
+        """
+        last_row = []
+        for col_start, col_end, block in self.__last_row_blocks__():
+            if block is None:
+                last_row += [self.max_value] * (col_end - col_start + 1)
+            else:
+                last_row += block.bottom_values()
+        return last_row
+
+    def get_last_column(self):
+        """Values of the last column of the matrix, one per position of P
+
+        Values larger than or equal to max_value are reported as max_value.
+        Returns:
+            list<int>: |P| values, the i-th one for P[:i+1] against T
+        """
+        last_column = []
+        line_start = 0
+        for v_block_id, line_end in enumerate(self.end_horizontal_blocks):
+            block = None
+            if v_block_id < len(self.last_column):
+                block = self.last_column[v_block_id]
+            if block is None:
+                last_column += [self.max_value] * (line_end - line_start + 1)
+            else:
+                last_column += block.right_values()
+            line_start = line_end + 1
+        return last_column
+
+    def best_ends_free_value(self):
+        """Semi global DTW distance: best value of the last row and of the last column
+
+        With the semi_global boundary, it is the distance of the best overlap
+        of P and T (a suffix of one against a prefix of the other, or one
+        contained in the other).
+        """
+        return min(self.get_last_row() + self.get_last_column())
+
+    def get_run_end_values(self):
+        """DTW distance of the best occurrence of P ending at each run end of T
+
+        Returns:
+            list<(int, int)>: (position in T, distance) for each position in end_vertical_blocks
+        """
+        return [
+            (col_end, self.max_value if block is None else block.br)
+            for _, col_end, block in self.__last_row_blocks__()
+        ]
+
+    def iter_occurrences(self, max_value=None):
+        """Iterates over occurrences of P in T of distance at most max_value
+
+        Args:
+            max_value (int): optional: maximal distance of reported occurrences,
+                values >= self.max_value are never reported as they are not exact
+
+        Yields:
+            (int, int): (end position in T, distance), by increasing position
+        """
+        if max_value is None or max_value >= self.max_value:
+            max_value = self.max_value - 1
+        for col_start, _, block in self.__last_row_blocks__():
+            if block is None or block.bl > max_value:
+                continue  # values only increase along a block
+            for x, value in enumerate(block.bottom_values()):
+                if value > max_value:
+                    break
+                yield col_start + x, value
+
+    def best_occurrence(self):
+        """Best occurrence of P in T
+
+        Returns:
+            (int, int): minimal distance (possibly saturated to max_value)
+                and the first end position in T where it is reached
+        """
+        best_value = None
+        best_position = None
+        for col_start, _, block in self.__last_row_blocks__():
+            value = self.max_value if block is None else block.bl
+            if best_value is None or value < best_value:
+                best_value = value
+                best_position = col_start
+        return best_value, best_position
+
+    def __check_matrix__(self):
+        if self.block_matrix is None:
+            raise ValueError(f"Blocks are not kept in {self.mode} mode")
+
+    def __neighbour__(self, v_block_id, h_block_id):
+        """Block (or border pseudo block) at the given position, -1 standing for borders"""
+        if v_block_id < 0:
+            return self.__top_border__(h_block_id)
+        if h_block_id < 0:
+            return self.left_border[v_block_id]
+        block = self.block_matrix[v_block_id][h_block_id]
+        if block is None:
+            return self.saturated_border
+        return block
+
+    def __block_borders__(self, v_block_id, h_block_id):
+        """Values around a block, read from the borders of its neighbours
+
+        Args:
+            v_block_id (int): row of blocks
+            h_block_id (int): column of blocks
+
+        Returns:
+            (int, int, list<int>, list<int>): first line and first column of the block,
+                values of the line above the block (width + 1 values, from the top left
+                corner) and of the column on its left (height + 1 values, from the top left corner)
+        """
+        line_end = self.end_horizontal_blocks[v_block_id]
+        line_start = 0
+        if v_block_id > 0:
+            line_start = self.end_horizontal_blocks[v_block_id - 1] + 1
+        col_end = self.end_vertical_blocks[h_block_id]
+        col_start = 0
+        if h_block_id > 0:
+            col_start = self.end_vertical_blocks[h_block_id - 1] + 1
+
+        north = self.__neighbour__(v_block_id - 1, h_block_id)
+        west = self.__neighbour__(v_block_id, h_block_id - 1)
+        Vnw = self.__neighbour__(v_block_id - 1, h_block_id - 1).br
+        values_from_cuts = self.block_class.values_from_cuts
+        north_values = values_from_cuts(
+            north.bl, north.bottom_cuts, col_end - col_start + 1
+        )
+        west_values = values_from_cuts(
+            west.tr, west.rightmost_cuts, line_end - line_start + 1
+        )
+        return line_start, col_start, [Vnw] + north_values, [Vnw] + west_values
+
+    def __block_cells__(self, v_block_id, h_block_id):
+        """Re-derives all values of a block from the borders of its neighbours
+
+        Args:
+            v_block_id (int): row of blocks
+            h_block_id (int): column of blocks
+
+        Returns:
+            list<list<int>>: (height + 1) x (width + 1) values, line 0 (resp. column 0) is
+                the line above (resp. the column on the left of) the block
+        """
+        _, _, north_values, west_values = self.__block_borders__(v_block_id, h_block_id)
+        cells = [north_values]
+        for Vw in west_values[1:]:
+            cells.append([Vw] + [0] * (len(north_values) - 1))
+
+        cost = 0 if self.P_letters[v_block_id] == self.T_letters[h_block_id] else 1
+        for i in range(1, len(west_values)):
+            for j in range(1, len(north_values)):
+                cells[i][j] = (
+                    min(cells[i - 1][j - 1], cells[i][j - 1], cells[i - 1][j]) + cost
+                )
+        return cells
+
+    def __check_cell__(self, i, j):
+        if not (0 <= i < len(self.P) and 0 <= j < len(self.T)):
+            raise ValueError(f"Cell ({i}, {j}) is not in the matrix")
+
+    def __cell_value__(self, i, j, v_block_id, h_block_id, borders):
+        """Value of cell (i, j) of a block from the values around it, in O(height + width)
+
+        In a block of mismatches, a cell at distance (x, y) of the top left corner
+        (line above and column on the left at distance 0) is reached at best from a
+        cell (0, y') of the line above through max(x, y - y') cells of the block,
+        or from a cell (x', 0) of the column on the left through max(x - x', y) cells.
+        A block of matches is constant.
+        """
+        line_start, col_start, north_values, west_values = borders
+        x = i - line_start + 1
+        y = j - col_start + 1
+        if self.P_letters[v_block_id] == self.T_letters[h_block_id]:
+            value = min(north_values[0], north_values[1], west_values[1])
+        else:
+            value = min(north_values[k] + max(x, y - k) for k in range(y + 1))
+            for k in range(x + 1):
+                if west_values[k] + max(x - k, y) < value:
+                    value = west_values[k] + max(x - k, y)
+        return min(value, self.max_value)
+
+    def value_at(self, i, j):
+        """Value of a cell of the matrix, re-derived from its block only
+
+        Only available in matrix mode.
+        Args:
+            i (int): position in P
+            j (int): position in T
+
+        Returns:
+            int: DTW distance between P[:i+1] and the best substring of T ending at j,
+                values larger than or equal to max_value are reported as max_value
+        """
+        return self.values_at([(i, j)])[0]
+
+    def values_at(self, cells):
+        """Values of several cells of the matrix (see value_at)
+
+        Borders of each block are derived once for all its queried cells.
+        Args:
+            cells (iterable<(int, int)>): (position in P, position in T) of each cell
+
+        Returns:
+            list<int>: one value per cell, in the same order
+        """
+        self.__check_matrix__()
+        values = []
+        borders_of_block = {}
+        for i, j in cells:
+            self.__check_cell__(i, j)
+            v_block_id = bisect_left(self.end_horizontal_blocks, i)
+            h_block_id = bisect_left(self.end_vertical_blocks, j)
+            if self.block_matrix[v_block_id][h_block_id] is None:
+                values.append(self.max_value)
+                continue
+            borders = borders_of_block.get((v_block_id, h_block_id))
+            if borders is None:
+                borders = self.__block_borders__(v_block_id, h_block_id)
+                borders_of_block[(v_block_id, h_block_id)] = borders
+            values.append(self.__cell_value__(i, j, v_block_id, h_block_id, borders))
+        return values
+
+    def warping_path(self, end_position):
+        """Optimal warping path of an occurrence of P ending at a given position of T
+
+        Only blocks crossed by the path are re-derived, from the borders of their
+        neighbours, in O(height x width) each. Ties are broken as in
+        PM_Matrix.trace_back: diagonal first, then left, then top.
+        Only available in matrix mode.
+
+        Args:
+            end_position (int): end position of the occurrence in T
+
+        Returns:
+            list<(int, int)>: cells (position in P, position in T) of the path, from
+                (0, start position) to (|P| - 1, end_position)
+        """
+        self.__check_matrix__()
+        if self.boundary != "pattern_matching":
+            raise ValueError(
+                "Occurrences are only traced back with the pattern_matching boundary"
+            )
+        if not 0 <= end_position < len(self.T):
+            raise ValueError(f"End position {end_position} is not a position of T")
+        path = []
+        i = len(self.P) - 1
+        j = end_position
+        v_block_id = len(self.end_horizontal_blocks) - 1
+        h_block_id = bisect_left(self.end_vertical_blocks, j)
+        cells = None
+        while i >= 0 and j >= 0:
+            if cells is None:
+                cells = self.__block_cells__(v_block_id, h_block_id)
+                line_start = self.end_horizontal_blocks[v_block_id] - len(cells) + 2
+                col_start = self.end_vertical_blocks[h_block_id] - len(cells[0]) + 2
+                equals = self.P_letters[v_block_id] == self.T_letters[h_block_id]
+                cost = 0 if equals else 1
+            x = i - line_start + 1
+            y = j - col_start + 1
+            if not path and cells[x][y] >= self.max_value:
+                raise ValueError(
+                    f"No occurrence of distance lower than {self.max_value} ends at {end_position}"
+                )
+            path.append((i, j))
+            # test first the diagonal, in order to favor diag in case of ex-aequos
+            if cells[x - 1][y - 1] + cost == cells[x][y]:
+                i -= 1
+                j -= 1
+            elif cells[x][y - 1] + cost == cells[x][y]:
+                j -= 1
+            elif cells[x - 1][y] + cost == cells[x][y]:
+                i -= 1
+            else:
+                raise ValueError(
+                    "This cell does not come from either the top, left or diagonal."
+                )
+            if i < line_start:
+                v_block_id -= 1
+                cells = None
+            if j < col_start:
+                h_block_id -= 1
+                cells = None
+        # here either i=-1 or j=-1
+        assert i == -1
+        path.reverse()
+        return path
+
+    def trace_back(self, end_position):
+        """Alignment of an optimal occurrence of P ending at a given position of T
+
+        Same output as PM_Matrix.trace_back(end_position + 1), without the full matrix.
+
+        Args:
+            end_position (int): end position of the occurrence in T
+
+        Returns:
+            (int, str, str): start position of the occurrence in T and the aligned P and T,
+                "-" standing for a letter repeated by the warping
+        """
+        path = self.warping_path(end_position)
+        alP = ""
+        alT = ""
+        previous_i, previous_j = -1, path[0][1] - 1
+        for i, j in path:
+            alP += self.P[i] if i != previous_i else "-"
+            alT += self.T[j] if j != previous_j else "-"
+            previous_i, previous_j = i, j
+        return path[0][1], alP, alT
+
+    def compute_origin_best_occurrence(self):
+        """Trace back of the best occurrence of P in T (see best_occurrence)"""
+        return self.trace_back(self.best_occurrence()[1])
+
+    def __all_cuts__(self, length):
+        """Cuts at every position of a line (or column) of the given length"""
+        if self.cut_intervals:
+            return [(0, length)] if length > 0 else []
+        return [i for i in range(length)]
+
+    def __increasing_border__(self, first_value, length):
+        """Pseudo block whose bottom line (and rightmost column) increases by one at each position
+
+        Values larger than max_value are saturated, as in computed blocks.
+        Args:
+            first_value (int): value at the first position
+            length (int): number of positions
+        """
+        cuts = self.__all_cuts__(max(0, min(length, self.max_value - first_value)))
+        return BorderBlock(
+            bl=min(first_value, self.max_value),
+            tr=min(first_value, self.max_value),
+            br=min(first_value + length - 1, self.max_value),
+            bottom_cuts=cuts,
+            rightmost_cuts=cuts,
+        )
+
+    def __left_border__(self):
+        """Pseudo blocks on the left of the first column of blocks, one per run of P
+
+        For pattern matching the column on the left of the matrix is infinite,
+        for global DTW it is 1, 2, ..., |P| and for semi global DTW it is made of zeros.
+        """
+        left_border = []
+        line_start = 0
+        for line_end in self.end_horizontal_blocks:
+            height = line_end - line_start + 1
+            if self.boundary == "global":
+                border = self.__increasing_border__(line_start + 1, height)
+            elif self.boundary == "semi_global":
+                border = BorderBlock(
+                    bl=0, tr=0, br=0, bottom_cuts=[], rightmost_cuts=[]
+                )
+            else:
+                border = BorderBlock(
+                    bl=sys.maxsize,
+                    tr=sys.maxsize,
+                    br=sys.maxsize,
+                    bottom_cuts=[],
+                    rightmost_cuts=self.__all_cuts__(height),
+                )
+            left_border.append(border)
+            line_start = line_end + 1
+        return left_border
+
+    def __top_border__(self, h_block_id):
+        """Pseudo block above the first row of blocks, for column of blocks h_block_id
+
+        h_block_id == -1 stands for the top left corner of the matrix, always 0.
+        For pattern matching and semi global DTW the line above the matrix is only
+        made of zeros, for global DTW it is 1, 2, ..., |T|.
+        """
+        if self.boundary == "global" and h_block_id >= 0:
+            col_start = 0
+            if h_block_id > 0:
+                col_start = self.end_vertical_blocks[h_block_id - 1] + 1
+            width = self.end_vertical_blocks[h_block_id] - col_start + 1
+            return self.__increasing_border__(col_start + 1, width)
+        return BorderBlock(bl=0, tr=0, br=0, bottom_cuts=[], rightmost_cuts=[])
+
     def __compute_blocks__(self):
         """Compute all blocks from a matrix"""
         # We compute blocks from top to bottom
         ## When we navigate in a row of blocks (h_block_id), blocks are delimited by the endpoints of vertical blocks.
         ## This explains why h_block_id is in end_vertical_blocks
         ## symmetrical explanation for a column of blocks
+        column = self.__left_border__()
+        if self.block_matrix is not None:
+            self.left_border = column
+        # the left border may have non saturated values (e.g. in a tile of the matrix)
+        for v_block_id, west in enumerate(column):
+            if west.tr < self.max_value:
+                self.last_active = v_block_id
         for h_block_id in range(len(self.end_vertical_blocks)):
-            for v_block_id in range(len(self.end_horizontal_blocks)):
-                # get 3 top values:
-                if v_block_id == 0:  # First column blocks
-                    Vnw = 0
-                    Vn = 0
-                    if h_block_id == 0:  # first block
-                        Vw = sys.maxsize
-                    else:
-                        Vw = self.block_matrix[0][h_block_id - 1].tr
-                elif h_block_id == 0:  # First line blocks:
-                    # case h_block_id == 0 already performed
-                    Vw = sys.maxsize
-                    Vnw = sys.maxsize
-                    Vn = self.block_matrix[v_block_id - 1][0].bl
-                else:  # any other bloc:
-                    Vn = self.block_matrix[v_block_id - 1][h_block_id].bl
-                    Vw = self.block_matrix[v_block_id][h_block_id - 1].tr
-                    Vnw = self.block_matrix[v_block_id - 1][h_block_id - 1].br
-
-                if v_block_id == 0:
-                    line_start = 0
-                else:
-                    line_start = self.end_horizontal_blocks[v_block_id - 1] + 1
-                line_end = self.end_horizontal_blocks[v_block_id]
-                if h_block_id == 0:
-                    col_start = 0
-                else:
-                    col_start = self.end_vertical_blocks[h_block_id - 1] + 1
-                col_end = self.end_vertical_blocks[h_block_id]
-                height = line_end - line_start + 1
-                width = col_end - col_start + 1
-
-                # get previous cuts
-                if v_block_id == 0:
-                    h_cuts = []  # we are in the first row, no cuts above
-                else:
-                    h_cuts = self.block_matrix[v_block_id - 1][h_block_id].bottom_cuts
-                if h_block_id == 0:
-                    v_cuts = [
-                        i for i in range(height)
-                    ]  # we are in the first column, only cuts on the left.
+            column = self.__compute_column__(h_block_id, column)
+            if self.block_matrix is not None:
+                for v_block_id, block in enumerate(column):
+                    self.block_matrix[v_block_id][h_block_id] = block
+            if self.last_row is not None:
+                if len(column) < len(self.end_horizontal_blocks):
+                    self.last_row.append(None)
                 else:
-                    v_cuts = self.block_matrix[v_block_id][
-                        h_block_id - 1
-                    ].rightmost_cuts
+                    self.last_row.append(column[-1])
+        self.last_column = column
+
+    def __reusable_block__(self, v_block_id, h_block_id):
+        """Block of the previous computation, if its values are exact
+
+        Values lower than the max_value of a computation are exact. Values of a
+        block are nondecreasing up to its bottom right value: if br is lower than
+        the previous max_value, the bottom line and the rightmost column of the
+        block are the same whatever the max_value, and so are its cuts.
+        """
+        if self.previous is None or self.previous.max_value > self.max_value:
+            return None
+        block = self.previous.block_matrix[v_block_id][h_block_id]
+        if block is None or block.br >= self.previous.max_value:
+            return None
+        return block
+
+    def __compute_column__(self, h_block_id, previous_column):
+        """Computes a column of blocks from the previous one
+
+        Ukkonen-like cut-off: once below the last non saturated block of the
+        previous column, the column is left as soon as a block only has saturated
+        input values, as all following blocks are saturated too.
+
+        Args:
+            h_block_id (int): index of the column of blocks
+            previous_column (list): blocks (or left border pseudo blocks) of column h_block_id - 1
+
+        Returns:
+            list: the blocks of column h_block_id, from top to bottom, None for
+                saturated blocks. Blocks after the last element are saturated.
+        """
+        if h_block_id == 0:
+            col_start = 0
+        else:
+            col_start = self.end_vertical_blocks[h_block_id - 1] + 1
+        col_end = self.end_vertical_blocks[h_block_id]
+        width = col_end - col_start + 1
+        T_letter = self.T_letters[h_block_id]
+
+        column = []
+        north = self.__top_border__(h_block_id)
+        north_west = self.__top_border__(h_block_id - 1)
+        last_active = -1
+        line_start = 0
+        for v_block_id, line_end in enumerate(self.end_horizontal_blocks):
+            west = None
+            if v_block_id < len(previous_column):
+                west = previous_column[v_block_id]
+            if west is None:
+                west = self.saturated_border
+
+            if min(north_west.br, west.tr, north.bl) >= self.max_value:
+                if v_block_id > self.last_active:
+                    break  # all next blocks of the column are saturated
+                column.append(None)
+                north = self.saturated_border
+                north_west = west
+                line_start = line_end + 1
+                continue
 
-                T_letter = self.T[col_end]
-                P_letter = self.P[line_end]
+            height = line_end - line_start + 1
+            P_letter = self.P_letters[v_block_id]
 
+            current_block = self.__reusable_block__(v_block_id, h_block_id)
+            if current_block is not None:
+                self.nb_reused_blocks += 1
+            else:
                 # Block(l, h, False, Vnw, Vw, Vn, h_cuts, v_cuts, line_start, line_end, column_start, column_end)
-                current_block = Block(
+                current_block = self.block_class(
                     height=height,
                     width=width,
                     equals=(P_letter == T_letter),
-                    Vnw=Vnw,
-                    Vw=Vw,
-                    Vn=Vn,
-                    h_cuts=h_cuts,
-                    v_cuts=v_cuts,
+                    Vnw=north_west.br,
+                    Vw=west.tr,
+                    Vn=north.bl,
+                    h_cuts=north.bottom_cuts,
+                    v_cuts=west.rightmost_cuts,
                     max_value=self.max_value,
                     line_start=line_start,
                     line_end=line_end,
                     column_start=col_start,
                     column_end=col_end,
                 )
+                self.nb_computed_blocks += 1
+            column.append(current_block)
+            if current_block.tl < self.max_value:
+                last_active = v_block_id
 
-                self.block_matrix[v_block_id][h_block_id] = current_block
+            north = current_block
+            north_west = west
+            line_start = line_end + 1
+        self.last_active = last_active
+        return column
 
 
 def main(P, T, max_value=sys.maxsize):
@@ -0,0 +1,404 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Computes the edit distance matrix between a pattern P and a text T by blocks
+    A block is defined by a^height x b^width letters to be compared, as in DtwByBlocks.
+    Edit distances of neighbouring cells differ by at most one, so the bottom line
+    and the rightmost column of a block are computed from the values around it
+    in O(height + width), but they are stored as lists of values and not as cuts.
+"""
+
+__author__ = "Garance Gourdel, Pierre Peterlongo"
+__email__ = "pierre.peterlongo@inria.fr, garance.gourdel@inria.fr"
+
+import sys
+from collections import deque
+
+from .DTW_blocks import DtwByBlocks
+
+
+def window_minima(values, size):
+    """Minimum of each window values[max(0, x - size + 1) .. x], in O(len(values))"""
+    minima = []
+    window = deque()  # positions of increasing values
+    for x, value in enumerate(values):
+        while window and values[window[-1]] >= value:
+            window.pop()
+        window.append(x)
+        if window[0] <= x - size:
+            window.popleft()
+        minima.append(values[window[0]])
+    return minima
+
+
+def suffix_minima(values):
+    """Minimum of each suffix values[x:]"""
+    minima = list(values)
+    for x in range(len(values) - 2, -1, -1):
+        minima[x] = min(minima[x], minima[x + 1])
+    return minima
+
+
+class EDBlock:
+    """ Class for a single block of the edit distance matrix """
+
+    def __init__(
+        self,
+        height: int,
+        width: int,
+        equals: bool,
+        Vnw: int,
+        north_values,
+        west_values,
+        max_value=sys.maxsize,
+        line_start=None,
+        line_end=None,
+        column_start=None,
+        column_end=None,
+    ):
+        """initialize and computes a block
+
+        Args:
+            height (int): height of the block
+            width (int): width of the block
+            equals (bool): are letters equal
+            Vnw (int): value on top left of the block (pos -1, -1)
+            north_values (list<int>): the width values of the line on top of the block (outside the block)
+            west_values (list<int>): the height values of the column on the left of the block (outside the block)
+            max_value (int): optional : values higher than max_value are saturated to max_value
+            line_start, line_end, column_start, column_end (int): optional : position of the block in a whole matrix
+        """
+        self.height = height
+        self.width = width
+        self.equals = equals
+        self.Vnw = Vnw
+        self.max_value = max_value
+        self.line_start = line_start
+        self.line_end = line_end
+        self.column_start = column_start
+        self.column_end = column_end
+
+        self.bottom = []
+        self.right = []
+        self.__compute_border__(north_values, west_values)
+        self.bl = self.bottom[0]
+        self.tr = self.right[0]
+        self.br = self.bottom[-1]
+
+    def __repr__(self):
+        """Returns a string repr of a block
+
+        Returns:
+            [str]: string repr of a block
+        """
+        res = ""
+        if self.line_start != None:
+            res += f" lins [{self.line_start},{self.line_end}]\n"
+            res += f" cols [{self.column_start},{self.column_end}]\n"
+        res += f" height = {self.height}, width = {self.width}\n"
+        res += f" external NW = {self.Vnw}\n"
+        res += f" right values = {self.right}\n"
+        res += f" bottom values = {self.bottom}\n"
+        return res
+
+    def bottom_values(self):
+        """Values of the last line of the block, from left to right"""
+        return self.bottom
+
+    def right_values(self):
+        """Values of the last column of the block, from top to bottom"""
+        return self.right
+
+    def __compute_border__(self, N, W):
+        """Computes the bottom line and the rightmost column of the block
+
+        A cell is reached at best from the top left corner, a cell of the line above
+        or a cell of the column on the left, through cells of the block only.
+        From a cell at distance (dx, dy) of the cell, the cost is max(dx, dy) in a
+        block of mismatches and |dx - dy| in a block of matches.
+        As consecutive values of N (and of W) differ by at most one, the best cell
+        of N (resp. W) is found among a window of positions (mismatches), or is a
+        single position (matches).
+        Values of W may all be infinite (left border of a pattern matching matrix).
+        """
+        h = self.height
+        w = self.width
+        corner = self.Vnw
+        if self.equals:
+            for j in range(w):
+                north = N[j - h] if j >= h else N[0] + h - j
+                west = W[h - 2 - j] if h - 2 - j >= 0 else W[0] + j + 2 - h
+                value = min(corner + abs(h - j - 1), north, west)
+                self.bottom.append(min(value, self.max_value))
+            for i in range(h):
+                west = W[i - w] if i >= w else W[0] + w - i
+                north = N[w - 2 - i] if w - 2 - i >= 0 else N[0] + i + 2 - w
+                value = min(corner + abs(i + 1 - w), west, north)
+                self.right.append(min(value, self.max_value))
+        else:
+            north_windows = window_minima(N, h + 1)
+            west_suffixes = suffix_minima(W)
+            for j in range(w):
+                value = min(
+                    corner + max(h, j + 1),
+                    h + north_windows[j],
+                    j + 1 + west_suffixes[max(0, h - 2 - j)],
+                )
+                self.bottom.append(min(value, self.max_value))
+            west_windows = window_minima(W, w + 1)
+            north_suffixes = suffix_minima(N)
+            for i in range(h):
+                value = min(
+                    corner + max(i + 1, w),
+                    w + west_windows[i],
+                    i + 1 + north_suffixes[max(0, w - 2 - i)],
+                )
+                self.right.append(min(value, self.max_value))
+
+
+class EDBorderBlock:
+    """Pseudo block standing for the line above or the column on the left of the matrix
+
+    Only defines what neighbouring blocks read: values of the bottom line and of
+    the rightmost column, bottom right value (read by the South-East block).
+    """
+
+    def __init__(self, bottom, right, br):
+        self.bottom = bottom
+        self.right = right
+        self.bl = bottom[0]
+        self.tr = right[0]
+        self.br = br
+
+    def __repr__(self):
+        return f" border bl = {self.bl}, tr = {self.tr}, br = {self.br}\n"
+
+    def bottom_values(self):
+        return self.bottom
+
+    def right_values(self):
+        return self.right
+
+
+class BlockED(DtwByBlocks):
+    """
+    Computes the edit distance matrix for a pattern P and a text T in O(#runsP |T| + |P| #runsT) time.
+    With the pattern_matching boundary, the last row is the one of PM_ED (match 0, mismatch 1, gap 1).
+    Shares the run decomposition and the column traversal of DtwByBlocks: values of
+    the last row and column, occurrences and block counts are available, cell queries,
+    alignments, interval cuts and block reuse (iterative deepening) are not.
+    """
+
+    def __init__(
+        self,
+        P,
+        T,
+        max_value=sys.maxsize,
+        mode="matrix",
+        boundary="pattern_matching",
+        cut_intervals=False,
+        previous=None,
+    ):
+        """Init and compute an edit distance matrix
+
+        cut_intervals and previous are only accepted for the signature of DtwByBlocks
+        (e.g. in from_rle), they raise a ValueError if set.
+        Args:
+            P ([str] or RunLengthSequence): Pattern string -> vertical in the matrix
+            T ([str] or RunLengthSequence): target string -> horizontal in the matrix
+            max_value (int): maximal value to be computed in the matrix
+            mode (str): see DtwByBlocks
+            boundary (str): "pattern_matching": 0 above and infinite on the left, as PM_ED,
+                "global": i on line i and j on column j, as DynamicMatrix.initGlobal_NW
+                with a gap of 1, "semi_global": 0 above and on the left
+        """
+        if cut_intervals:
+            raise ValueError("Interval cuts are not available for the edit distance")
+        if previous is not None:
+            raise ValueError("Blocks are not reused for the edit distance")
+        super().__init__(P, T, max_value, mode=mode, boundary=boundary)
+
+    @classmethod
+    def iterative_deepening(cls, P, T, max_value=8, target="br", **kwargs):
+        raise ValueError("Iterative deepening is not available for the edit distance")
+
+    def best_occurrence(self):
+        """Best occurrence of P in T
+
+        Returns:
+            (int, int): minimal distance (possibly saturated to max_value)
+                and the first end position in T where it is reached
+        """
+        last_row = self.get_last_row()
+        best_value = min(last_row)
+        return best_value, last_row.index(best_value)
+
+    def iter_occurrences(self, max_value=None):
+        """Iterates over occurrences of P in T of distance at most max_value
+
+        Args:
+            max_value (int): optional: maximal distance of reported occurrences,
+                values >= self.max_value are never reported as they are not exact
+
+        Yields:
+            (int, int): (end position in T, distance), by increasing position
+        """
+        if max_value is None or max_value >= self.max_value:
+            max_value = self.max_value - 1
+        for position, value in enumerate(self.get_last_row()):
+            if value <= max_value:
+                yield position, value
+
+    def values_at(self, cells):
+        raise ValueError("Cell queries are not available for the edit distance")
+
+    def warping_path(self, end_position):
+        raise ValueError("Alignments are not available for the edit distance")
+
+    def trace_back(self, end_position):
+        raise ValueError("Alignments are not available for the edit distance")
+
+    def compute_origin_best_occurrence(self):
+        raise ValueError("Alignments are not available for the edit distance")
+
+    def __reusable_block__(self, v_block_id, h_block_id):
+        """EDBlock values are not monotone: blocks of a previous computation are never reused"""
+        return None
+
+    def __left_border__(self):
+        """Pseudo blocks on the left of the first column of blocks, one per run of P
+
+        For pattern matching the column on the left of the matrix is infinite,
+        for global alignment it is 1, 2, ..., |P| and for semi global alignment it is made of zeros.
+        """
+        left_border = []
+        line_start = 0
+        for line_end in self.end_horizontal_blocks:
+            height = line_end - line_start + 1
+            if self.boundary == "global":
+                right = [
+                    min(line_start + 1 + x, self.max_value) for x in range(height)
+                ]
+            elif self.boundary == "semi_global":
+                right = [0] * height
+            else:
+                right = [sys.maxsize] * height
+            left_border.append(
+                EDBorderBlock(bottom=right[-1:], right=right, br=right[-1])
+            )
+            line_start = line_end + 1
+        return left_border
+
+    def __top_border__(self, h_block_id):
+        """Pseudo block above the first row of blocks, for column of blocks h_block_id
+
+        h_block_id == -1 stands for the top left corner of the matrix, always 0.
+        For pattern matching and semi global alignment the line above the matrix
+        is only made of zeros, for global alignment it is 1, 2, ..., |T|.
+        """
+        if h_block_id < 0:
+            return EDBorderBlock(bottom=[0], right=[0], br=0)
+        col_start = 0
+        if h_block_id > 0:
+            col_start = self.end_vertical_blocks[h_block_id - 1] + 1
+        width = self.end_vertical_blocks[h_block_id] - col_start + 1
+        if self.boundary == "global":
+            bottom = [min(col_start + 1 + y, self.max_value) for y in range(width)]
+        else:
+            bottom = [0] * width
+        return EDBorderBlock(bottom=bottom, right=bottom[-1:], br=bottom[-1])
+
+    def __compute_column__(self, h_block_id, previous_column):
+        """Computes a column of blocks from the previous one (see DtwByBlocks.__compute_column__)
+
+        Args:
+            h_block_id (int): index of the column of blocks
+            previous_column (list): blocks (or left border pseudo blocks) of column h_block_id - 1
+
+        Returns:
+            list: the blocks of column h_block_id, from top to bottom, None for
+                saturated blocks. Blocks after the last element are saturated.
+        """
+        if h_block_id == 0:
+            col_start = 0
+        else:
+            col_start = self.end_vertical_blocks[h_block_id - 1] + 1
+        col_end = self.end_vertical_blocks[h_block_id]
+        width = col_end - col_start + 1
+        T_letter = self.T_letters[h_block_id]
+
+        column = []
+        north = self.__top_border__(h_block_id)
+        north_west = self.__top_border__(h_block_id - 1)
+        last_active = -1
+        line_start = 0
+        for v_block_id, line_end in enumerate(self.end_horizontal_blocks):
+            height = line_end - line_start + 1
+            west = None
+            if v_block_id < len(previous_column):
+                west = previous_column[v_block_id]
+
+            # saturated blocks are None
+            Vnw = self.max_value if north_west is None else north_west.br
+            if north is None:
+                north_values = [self.max_value] * width
+            else:
+                north_values = north.bottom_values()
+            if west is None:
+                west_values = [self.max_value] * height
+            else:
+                west_values = west.right_values()
+
+            if min(Vnw, min(north_values), min(west_values)) >= self.max_value:
+                if v_block_id > self.last_active:
+                    break  # all next blocks of the column are saturated
+                column.append(None)
+                north = None
+                north_west = west
+                line_start = line_end + 1
+                continue
+
+            current_block = EDBlock(
+                height=height,
+                width=width,
+                equals=(self.P_letters[v_block_id] == T_letter),
+                Vnw=Vnw,
+                north_values=north_values,
+                west_values=west_values,
+                max_value=self.max_value,
+                line_start=line_start,
+                line_end=line_end,
+                column_start=col_start,
+                column_end=col_end,
+            )
+            column.append(current_block)
+            self.nb_computed_blocks += 1
+            if min(current_block.right) < self.max_value:
+                last_active = v_block_id
+
+            north = current_block
+            north_west = west
+            line_start = line_end + 1
+        self.last_active = last_active
+        return column
+
+
+def main(P, T, max_value=sys.maxsize):
+    """Computes an edit distance matrix
+
+    Args:
+        P ([str]): pattern
+        T ([str]): target
+    """
+    ed = BlockED(P, T, max_value)
+    print(ed)
+    print(f"last row {ed.get_last_row()}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        main(sys.argv[1], sys.argv[2])
+    elif len(sys.argv) == 4:
+        main(sys.argv[1], sys.argv[2], int(sys.argv[3]))
+    else:
+        sys.stderr.write(f"Usage: python {sys.argv[0]} P T <max_value>\n")
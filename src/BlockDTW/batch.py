@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Searches many patterns in a text with a pool of processes
+    The text is sent to each worker once, when the worker starts, and compiled
+    there. Patterns are submitted by chunks and results are streamed back in
+    the order of the patterns. (P, T) pairs of different texts are sent with their
+    text, compiled for the pair only.
+"""
+
+__author__ = "Garance Gourdel, Pierre Peterlongo"
+__email__ = "pierre.peterlongo@inria.fr, garance.gourdel@inria.fr"
+
+import sys
+from multiprocessing import Pool
+
+from dynamic_prog import compiled as dp_compiled
+from . import compiled as block_compiled
+from .runs import RunLengthSequence
+
+engines = ("block", "dtw", "ed")
+
+# state of a worker, set once by init_worker
+_worker = {}
+
+
+def compile_text(T, engine):
+    """Text compiled for an engine"""
+    if engine == "block":
+        return RunLengthSequence.from_string(T)
+    return dp_compiled.CompiledText(T)
+
+
+def init_worker(T, engine, max_value, cut_intervals):
+    """Compiles the text once in each worker"""
+    _worker["text"] = compile_text(T, engine)
+    _worker["engine"] = engine
+    _worker["max_value"] = max_value
+    _worker["cut_intervals"] = cut_intervals
+
+
+def search_text(pattern, text):
+    """Best occurrence of a pattern in a compiled text, with the engine of the worker
+
+    Returns:
+        (int, int): minimal distance (values >= max_value are reported as max_value)
+            and its first end position in the text (0-based)
+    """
+    max_value = _worker["max_value"]
+    if _worker["engine"] == "block":
+        return block_compiled.search(
+            pattern, text, max_value, _worker["cut_intervals"]
+        )
+    value, column = dp_compiled.search(pattern, text, _worker["engine"], max_value)
+    return value, column - 1
+
+
+def search(pattern):
+    """Best occurrence of a pattern in the text of the worker (see search_text)"""
+    return search_text(pattern, _worker["text"])
+
+
+def search_pair(pair):
+    """Best occurrence of P in T for a (P, T) pair, the text being compiled for this pair only"""
+    P, T = pair
+    return search_text(P, compile_text(T, _worker["engine"]))
+
+
+def search_many(
+    patterns,
+    T,
+    engine="block",
+    max_value=sys.maxsize,
+    processes=None,
+    chunksize=16,
+    cut_intervals=False,
+):
+    """Best occurrence of each pattern in a text, computed by a pool of processes
+
+    Args:
+        patterns (iterable<str>): patterns, submitted chunksize by chunksize
+        T (str): text, sent once to each worker
+        engine (str): "block" (DtwByBlocks), "dtw" (as PM_DTW) or "ed" (as PM_ED)
+        max_value (int): maximal value to be computed in the matrices, larger distances
+            are reported as max_value
+        processes (int): number of workers, default: number of CPUs
+        chunksize (int): number of patterns sent to a worker at once
+        cut_intervals (bool): see DtwByBlocks (block engine)
+
+    Yields:
+        (int, int): minimal distance and its first end position in T (0-based),
+            for each pattern in order, as soon as it and all previous ones are computed
+    """
+    if engine not in engines:
+        raise ValueError(f"Unknown engine {engine}, expected one of {engines}")
+    with Pool(
+        processes,
+        initializer=init_worker,
+        initargs=(T, engine, max_value, cut_intervals),
+    ) as pool:
+        yield from pool.imap(search, patterns, chunksize)
+
+
+def search_pairs(
+    pairs, engine="block", max_value=sys.maxsize, processes=None, chunksize=16
+):
+    """Best occurrence of P in T for each (P, T) pair, computed by a pool of processes
+
+    Each text is sent with its pattern: use search_many when all pairs share the same text.
+    Args:
+        pairs (iterable<(str, str)>): (P, T) pairs
+        engine, max_value, processes, chunksize: see search_many
+
+    Yields:
+        (int, int): minimal distance and its first end position in T, for each pair in order
+    """
+    if engine not in engines:
+        raise ValueError(f"Unknown engine {engine}, expected one of {engines}")
+    with Pool(
+        processes,
+        initializer=init_worker,
+        initargs=("", engine, max_value, False),  # texts come with the pairs
+    ) as pool:
+        yield from pool.imap(search_pair, pairs, chunksize)
+
+
+def main(T, engine, *patterns):
+    for P, (value, position) in zip(patterns, search_many(patterns, T, engine)):
+        print(f"{P}: cost {value} for an occurrence ending at {position} in T")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 4:
+        main(sys.argv[1], sys.argv[2], *sys.argv[3:])
+    else:
+        sys.stderr.write(f"Usage: python {sys.argv[0]} T block|dtw|ed P1 <P2 ...>\n")
@@ -10,6 +10,192 @@ __email__ = "pierre.peterlongo@inria.fr, garance.gourdel@inria.fr"
 import sys  # for maxsize
 
 
+def left_cuts(height, tl, Vnw, Vw, Vn, v_cuts, max_value):
+    """Computes internal left cuts of a block
+
+    The delta first cuts come from a North West (and West) value higher than the
+    North value, a cut at position 0 from an external cut at position -1, and
+    each external cut at position i gives an internal cut at position i + 1.
+
+    Returns:
+        (list<int>, int): the internal left cuts and the bottom left value
+    """
+    cuts = []
+    if height == 1 or tl == max_value:
+        return cuts, tl
+    current_value = tl
+    first_impossible_cut = height - 1
+    last_used_cut = -1
+    # the North West and West values are higher than the North value by delta:
+    # this generates delta cuts in the start of the first column
+    delta = Vnw if Vnw < Vw else Vw
+    delta -= Vn
+    for i in range(delta if delta < first_impossible_cut else first_impossible_cut):
+        cuts.append(i)
+        last_used_cut = i
+        current_value += 1
+        if current_value == max_value:
+            return cuts, current_value
+    # corresponds to an external cut at position -1
+    if Vw == Vnw + 1 or Vw == sys.maxsize:
+        potential_new_cut = last_used_cut + 1
+        if potential_new_cut < first_impossible_cut:
+            cuts.append(potential_new_cut)
+            last_used_cut = potential_new_cut
+            current_value += 1
+            if current_value == max_value:
+                return cuts, current_value
+    # general case: an external cut position i generates an internal cut position i+1
+    for v_cut in v_cuts:
+        potential_new_cut = v_cut + 1
+        if potential_new_cut <= last_used_cut:
+            potential_new_cut = last_used_cut + 1
+        if potential_new_cut >= first_impossible_cut:
+            break  # cuts are sorted, next ones are not possible either
+        cuts.append(potential_new_cut)
+        last_used_cut = potential_new_cut
+        current_value += 1
+        if current_value == max_value:
+            break
+    return cuts, current_value
+
+
+def top_cuts(width, tl, Vnw, Vw, Vn, h_cuts, max_value):
+    """Computes internal top cuts of a block, symmetrical to left_cuts
+
+    Returns:
+        (list<int>, int): the internal top cuts and the top right value
+    """
+    cuts = []
+    if width == 1 or tl == max_value:
+        return cuts, tl
+    current_value = tl
+    first_impossible_cut = width - 1
+    last_used_cut = -1
+    delta = Vnw if Vnw < Vn else Vn
+    delta -= Vw
+    for i in range(delta if delta < first_impossible_cut else first_impossible_cut):
+        cuts.append(i)
+        last_used_cut = i
+        current_value += 1
+        if current_value == max_value:
+            return cuts, current_value
+    if Vn == Vnw + 1:
+        potential_new_cut = last_used_cut + 1
+        if potential_new_cut < first_impossible_cut:
+            cuts.append(potential_new_cut)
+            last_used_cut = potential_new_cut
+            current_value += 1
+            if current_value == max_value:
+                return cuts, current_value
+    for h_cut in h_cuts:
+        potential_new_cut = h_cut + 1
+        if potential_new_cut <= last_used_cut:
+            potential_new_cut = last_used_cut + 1
+        if potential_new_cut >= first_impossible_cut:
+            break  # cuts are sorted, next ones are not possible either
+        cuts.append(potential_new_cut)
+        last_used_cut = potential_new_cut
+        current_value += 1
+        if current_value == max_value:
+            break
+    return cuts, current_value
+
+
+def bottom_cuts(height, width, bl, tr, leftmost, top, max_value):
+    """Computes bottom cuts of a block from its left and top cuts
+
+    Values do not exceed max_value. leftmost and top are sorted lists, membership
+    is tested by walking them from their end while the position decreases,
+    in O(height + width).
+
+    Returns:
+        (list<int>, int): the bottom cuts and the bottom right value
+    """
+    if height == 1:
+        return top, tr
+    cuts = []
+    current_value = bl
+    if current_value == max_value:
+        return cuts, current_value
+    k = len(leftmost) - 1
+    if height < width:
+        # h-1 positions for the bottom of the first square - reversed order to keep the cut array sorted
+        for x in range(height - 2, -1, -1):
+            while k >= 0 and leftmost[k] > x:
+                k -= 1
+            if k < 0 or leftmost[k] != x:
+                cuts.append(height - 2 - x)
+                current_value += 1
+                if current_value == max_value:
+                    return cuts, current_value
+        # diagonal values
+        for y in top:
+            if y >= width - height:
+                break
+            cuts.append(y + height - 1)
+            current_value += 1
+            if current_value == max_value:
+                return cuts, current_value
+    else:
+        # l-1 positions for the bottom of the first square
+        for x in range(width - 1):
+            z = height - x - 2
+            while k >= 0 and leftmost[k] > z:
+                k -= 1
+            if k < 0 or leftmost[k] != z:
+                cuts.append(x)
+                current_value += 1
+                if current_value == max_value:
+                    return cuts, current_value
+    return cuts, current_value
+
+
+def right_cuts(height, width, tr, leftmost, top, max_value):
+    """Computes right cuts of a block from its left and top cuts, symmetrical to bottom_cuts
+
+    Returns:
+        (list<int>, int): the right cuts and the bottom right value
+    """
+    if width == 1:
+        return leftmost, tr + len(leftmost)
+    cuts = []
+    current_value = tr
+    if current_value == max_value:
+        return cuts, current_value
+    k = len(top) - 1
+    if height < width:
+        # h-1 positions for the right of the last square
+        for y in range(height - 1):
+            z = width - y - 2
+            while k >= 0 and top[k] > z:
+                k -= 1
+            if k < 0 or top[k] != z:
+                cuts.append(y)
+                current_value += 1
+                if current_value == max_value:
+                    return cuts, current_value
+    else:
+        # l-1 positions for the right of the first square - reversed order to keep the cut array sorted
+        for y in range(width - 2, -1, -1):
+            while k >= 0 and top[k] > y:
+                k -= 1
+            if k < 0 or top[k] != y:
+                cuts.append(width - 2 - y)
+                current_value += 1
+                if current_value == max_value:
+                    return cuts, current_value
+        # diagonal values
+        for x in leftmost:
+            if x >= height - width:
+                break
+            cuts.append(x + width - 1)
+            current_value += 1
+            if current_value == max_value:
+                return cuts, current_value
+    return cuts, current_value
+
+
 class Block:
     """ Class for a single block of the DTW matrix """
 
@@ -97,202 +283,99 @@ class Block:
 
         return res
 
-    def __compute_bottom_cuts__(self):
-        """From top and left cuts, computes bottom cuts
+    @staticmethod
+    def values_from_cuts(start_value, cuts, length):
+        """Values of a line (or column) from its first value and its cuts
+
+        Args:
+            start_value (int): first value
+            cuts (list<int>): positions x where the value at x+1 is the value at x plus one
+            length (int): number of values
 
-        do not exceed max_value
         Returns:
-            int: the maximal value obtained in the last line
+            list<int>: length values
         """
+        values = []
+        current_value = start_value
+        cuts = iter(cuts)
+        next_cut = next(cuts, length)
+        for x in range(length):
+            values.append(current_value)
+            if x == next_cut:
+                current_value += 1
+                next_cut = next(cuts, length)
+        return values
 
-        if self.height == 1:
-            self.bottom_cuts = self.top_cuts
-            return self.tr
-        current_value = self.bl
-        if current_value == self.max_value:
-            return current_value
-        if self.height < self.width:
-            # h-1 positions for the bottom of the first square - reversed order to keep the cut array sorted
-            for x in range(self.height - 2, -1, -1):
-                if x not in self.leftmost_cuts:
-                    self.bottom_cuts.append(self.height - 2 - x)
-                    current_value += 1
-                    if current_value == self.max_value:
-                        return current_value
-
-            # diagonal values
-            for y in range(self.width - self.height):
-                if y in self.top_cuts:
-                    self.bottom_cuts.append(y + self.height - 1)
-                    current_value += 1
-                    if current_value == self.max_value:
-                        return current_value
-        else:
-            # l-1 positions for the bottom of the first square
-            for x in range(self.width - 1):
-                if self.height - x - 2 not in self.leftmost_cuts:
-                    self.bottom_cuts.append(x)
-                    current_value += 1
-                    if current_value == self.max_value:
-                        return current_value
-        return current_value
-
-    def __compute_right_cuts__(self):
-        """From top and left cuts, computes right cuts
+    def bottom_values(self):
+        """Values of the last line of the block, from left to right
 
-        do not exceed max_value
         Returns:
-            int: the maximal value obtained in the last column
+            list<int>: width values, starting with bl and increasing by one after each bottom cut
         """
-        if self.width == 1:
-            self.rightmost_cuts = self.leftmost_cuts
-            return self.br
-
-        current_value = self.tr
-        if current_value == self.max_value:
-            return current_value
-        if self.height < self.width:
-            # h-1 positions for the right of the last square
-            for y in range(self.height - 1):
-                if self.width - y - 2 not in self.top_cuts:
-                    self.rightmost_cuts.append(y)
-                    current_value += 1
-                    if current_value == self.max_value:
-                        return current_value
-        else:
-            # l-1 positions for the right of the first square - reversed order to keep the cut array sorted
-            for y in range(self.width - 2, -1, -1):
-                if y not in self.top_cuts:
-                    self.rightmost_cuts.append(self.width - 2 - y)
-                    current_value += 1
-                    if current_value == self.max_value:
-                        return current_value
-
-            # diagonal values
-            for x in range(self.height - self.width):
-                if x in self.leftmost_cuts:
-                    self.rightmost_cuts.append(x + self.width - 1)
-                    current_value += 1
-                    if current_value == self.max_value:
-                        return current_value
-
-        return current_value
-
-    def __compute_left_cuts__(self):
-        """Computes internal left cut and bottom left value
+        return self.values_from_cuts(self.bl, self.bottom_cuts, self.width)
 
-            From left cuts and internal Vnw, Vn, and Vw value: create the
-            internal rightmost_cuts
+    def right_values(self):
+        """Values of the last column of the block, from top to bottom
 
         Returns:
-            int: the maximal value obtained in the last cell of the first column
+            list<int>: height values, starting with tr and increasing by one after each right cut
         """
+        return self.values_from_cuts(self.tr, self.rightmost_cuts, self.height)
 
-        # shortcut in case of a tiny block
-        if self.height == 1:
-            return self.tl
-
-        current_value = self.tl
+    def __compute_bottom_cuts__(self):
+        """From top and left cuts, computes bottom cuts (see bottom_cuts)
 
-        first_impossible_cut = self.height - 1
-        last_used_cut = -1  # short cut
+        Returns:
+            int: the maximal value obtained in the last line
+        """
+        self.bottom_cuts, value = bottom_cuts(
+            self.height,
+            self.width,
+            self.bl,
+            self.tr,
+            self.leftmost_cuts,
+            self.top_cuts,
+            self.max_value,
+        )
+        return value
 
-        if current_value == self.max_value:
-            return current_value
+    def __compute_right_cuts__(self):
+        """From top and left cuts, computes right cuts (see right_cuts)
 
-        # special case, the North West value is higher than the North value, by delta
-        # This generates delta cuts in the start of the first column.
-        # For all following cuts: they come after these first delta cuts
-        delta_NW_N = max(0, self.Vnw - self.Vn)
-        delta_W_N = max(0, self.Vw - self.Vn)
-        delta = min(delta_NW_N, delta_W_N)
-        for i in range(min(delta, first_impossible_cut)):
-            self.leftmost_cuts.append(i)
-            last_used_cut = i
-            current_value += 1
-            if current_value == self.max_value:
-                return current_value
-
-        # special case, corresponds to a cut in -1 position in the external cuts.
-        # needs to be performed externally (on should simply add a -1 to external cuts, but this would imply to sort the list)
-        if self.Vw == self.Vnw + 1 or self.Vw == sys.maxsize:
-            potential_new_cut = max(0, last_used_cut + 1)
-            if potential_new_cut < first_impossible_cut:
-                self.leftmost_cuts.append(potential_new_cut)
-                last_used_cut = potential_new_cut
-                current_value += 1
-                if current_value == self.max_value:
-                    return current_value
+        Returns:
+            int: the maximal value obtained in the last column
+        """
+        self.rightmost_cuts, value = right_cuts(
+            self.height,
+            self.width,
+            self.tr,
+            self.leftmost_cuts,
+            self.top_cuts,
+            self.max_value,
+        )
+        return value
 
-        # general case: an external cut position i generates an internal cut position i+1
-        # add the delta shift.
-        for v_cut in self.v_cuts:
-            potential_new_cut = max(v_cut + 1, last_used_cut + 1)
-            if potential_new_cut < first_impossible_cut:
-                self.leftmost_cuts.append(potential_new_cut)
-                last_used_cut = potential_new_cut
-                current_value += 1
-                if current_value == self.max_value:
-                    return current_value
+    def __compute_left_cuts__(self):
+        """Computes internal left cuts and bottom left value (see left_cuts)
 
-        return current_value
+        Returns:
+            int: the maximal value obtained in the last cell of the first column
+        """
+        self.leftmost_cuts, value = left_cuts(
+            self.height, self.tl, self.Vnw, self.Vw, self.Vn, self.v_cuts, self.max_value
+        )
+        return value
 
     def __compute_top_cuts__(self):
-        """Computes internal top cut and top right value
-
-            From left cuts and internal Vnw, Vn, and Vw value: create the
-            internal top_cuts
+        """Computes internal top cuts and top right value (see top_cuts)
 
         Returns:
             int: the maximal value obtained in the last cell of the first row
         """
-        # shortcut in case of a tiny block
-        if self.width == 1:
-            return self.tl
-
-        current_value = self.tl
-        first_impossible_cut = self.width - 1
-        last_used_cut = -1  # short cut
-
-        if current_value == self.max_value:
-            return current_value
-
-        # special case, the North West value is higher than the West value, by delta
-        # This generates delta cuts in the start of the first row.
-        # For all following cuts: they come after these first delta cuts
-        delta_NW_W = max(0, self.Vnw - self.Vw)
-        delta_N_W = max(0, self.Vn - self.Vw)
-        delta = min(delta_NW_W, delta_N_W)
-        for i in range(min(delta, first_impossible_cut)):
-            self.top_cuts.append(i)
-            last_used_cut = i
-            current_value += 1
-            if current_value == self.max_value:
-                return current_value
-
-        # special case, corresponds to a cut in -1 position in the external cuts
-        # simply add a -1 to the self.leftmost_cuts
-        if self.Vn == self.Vnw + 1:
-            potential_new_cut = max(0, last_used_cut + 1)
-            if potential_new_cut < first_impossible_cut:
-                self.top_cuts.append(potential_new_cut)
-                last_used_cut = potential_new_cut
-                current_value += 1
-                if current_value == self.max_value:
-                    return current_value
-
-        # general case: an external cut position i generates an internal cut position i+1
-        # add the delta shift.
-        for h_cut in self.h_cuts:
-            potential_new_cut = max(h_cut + 1, last_used_cut + 1)
-            if potential_new_cut < first_impossible_cut:
-                self.top_cuts.append(potential_new_cut)
-                last_used_cut = potential_new_cut
-                current_value += 1
-                if current_value == self.max_value:
-                    return current_value
-
-        return current_value
+        self.top_cuts, value = top_cuts(
+            self.width, self.tl, self.Vnw, self.Vw, self.Vn, self.h_cuts, self.max_value
+        )
+        return value
 
     def __compute_border__(self):
         """Computes the border of the block
@@ -333,6 +416,228 @@ class Block:
         ), f"Internal error : {br_again} != {self.br} \n {self}"
 
 
+def cuts_to_intervals(cuts):
+    """Converts a sorted list of cut positions into a list of (start, length) intervals
+
+    Args:
+        cuts (list<int>): sorted cut positions
+
+    Returns:
+        list<(int, int)>: maximal runs of consecutive positions
+    """
+    intervals = []
+    for cut in cuts:
+        add_interval(intervals, cut, 1)
+    return intervals
+
+
+def intervals_to_cuts(intervals):
+    """Converts a list of (start, length) intervals into a sorted list of cut positions"""
+    return [start + i for start, length in intervals for i in range(length)]
+
+
+def add_interval(intervals, start, length):
+    """Appends the interval (start, length) to intervals, merging it with the last one if they touch"""
+    if intervals and intervals[-1][0] + intervals[-1][1] == start:
+        intervals[-1] = (intervals[-1][0], intervals[-1][1] + length)
+    else:
+        intervals.append((start, length))
+
+
+def complement_intervals(intervals, lo, hi):
+    """Positions of [lo, hi) not covered by intervals, as a list of (start, length) intervals"""
+    gaps = []
+    position = lo
+    for start, length in intervals:
+        if start + length <= position:
+            continue
+        if start >= hi:
+            break
+        if start > position:
+            gaps.append((position, start - position))
+        position = start + length
+    if position < hi:
+        gaps.append((position, hi - position))
+    return gaps
+
+
+class IntervalBlock(Block):
+    """Block whose cuts are lists of (start, length) intervals of consecutive cut positions
+
+    Computing a block is in O(#intervals) instead of O(height + width), which
+    makes large homopolymer blocks almost constant time.
+    h_cuts and v_cuts are given as intervals, and bottom_cuts, top_cuts,
+    leftmost_cuts and rightmost_cuts are computed as intervals.
+    """
+
+    def __push_cuts__(self, cuts, intervals, current_value):
+        """Appends intervals to cuts, each cut position increases current_value by one
+
+        Stops as soon as max_value is reached.
+        Returns:
+            int: the value after the last cut
+        """
+        for start, length in intervals:
+            length = min(length, self.max_value - current_value)
+            add_interval(cuts, start, length)
+            current_value += length
+            if current_value == self.max_value:
+                break
+        return current_value
+
+    def __mirror_gaps__(self, intervals, lo, hi):
+        """Positions p of [lo, hi) not in intervals, as intervals of hi - 1 - p in increasing order"""
+        return [
+            (hi - start - length, length)
+            for start, length in reversed(complement_intervals(intervals, lo, hi))
+        ]
+
+    @staticmethod
+    def values_from_cuts(start_value, cuts, length):
+        """Values of a line (or column) from its first value and its cut intervals
+
+        Args:
+            start_value (int): first value
+            cuts (list<(int, int)>): intervals of positions x where the value at x+1 is the value at x plus one
+            length (int): number of values
+
+        Returns:
+            list<int>: length values
+        """
+        values = []
+        current_value = start_value
+        for start, nb_cuts in cuts:
+            if start + 1 >= length:
+                break
+            values += [current_value] * (start + 1 - len(values))
+            nb_cuts = min(nb_cuts, length - 1 - start)
+            values += [current_value + i for i in range(1, nb_cuts + 1)]
+            current_value += nb_cuts
+        values += [current_value] * (length - len(values))
+        return values
+
+    def __compute_bottom_cuts__(self):
+        """From top and left cut intervals, computes bottom cut intervals
+
+        Returns:
+            int: the maximal value obtained in the last line
+        """
+        if self.height == 1:
+            self.bottom_cuts = self.top_cuts
+            return self.tr
+        current_value = self.bl
+        if current_value == self.max_value:
+            return current_value
+        # first square: positions of the first column which are not cuts, reversed
+        current_value = self.__push_cuts__(
+            self.bottom_cuts,
+            self.__mirror_gaps__(
+                self.leftmost_cuts, max(0, self.height - self.width), self.height - 1
+            ),
+            current_value,
+        )
+        if current_value == self.max_value or self.height >= self.width:
+            return current_value
+        # diagonal values
+        diagonal = []
+        for start, length in self.top_cuts:
+            if start >= self.width - self.height:
+                break
+            length = min(length, self.width - self.height - start)
+            diagonal.append((start + self.height - 1, length))
+        return self.__push_cuts__(self.bottom_cuts, diagonal, current_value)
+
+    def __compute_right_cuts__(self):
+        """From top and left cut intervals, computes right cut intervals
+
+        Returns:
+            int: the maximal value obtained in the last column
+        """
+        if self.width == 1:
+            self.rightmost_cuts = self.leftmost_cuts
+            return self.br
+        current_value = self.tr
+        if current_value == self.max_value:
+            return current_value
+        # last square: positions of the first row which are not cuts, reversed
+        current_value = self.__push_cuts__(
+            self.rightmost_cuts,
+            self.__mirror_gaps__(
+                self.top_cuts, max(0, self.width - self.height), self.width - 1
+            ),
+            current_value,
+        )
+        if current_value == self.max_value or self.width >= self.height:
+            return current_value
+        # diagonal values
+        diagonal = []
+        for start, length in self.leftmost_cuts:
+            if start >= self.height - self.width:
+                break
+            length = min(length, self.height - self.width - start)
+            diagonal.append((start + self.width - 1, length))
+        return self.__push_cuts__(self.rightmost_cuts, diagonal, current_value)
+
+    def __shift_cuts__(self, cuts, external_cuts, delta, minus_one_cut, size):
+        """Computes internal first row or first column cut intervals
+
+        Args:
+            cuts (list<(int, int)>): internal cuts to fill
+            external_cuts (list<(int, int)>): cuts of the line (or column) outside the block
+            delta (int): number of cuts starting the row (or column)
+            minus_one_cut (bool): is there an external cut at position -1
+            size (int): width (or height) of the block
+
+        Returns:
+            int: the maximal value obtained in the last cell of the row (or column)
+        """
+        current_value = self.tl
+        if size == 1 or current_value == self.max_value:
+            return current_value
+        first_impossible_cut = size - 1
+        next_cut = 0  # first position that can be used by a cut
+        shifted = []
+        if delta > 0:
+            next_cut = min(delta, first_impossible_cut)
+            shifted.append((0, next_cut))
+        if minus_one_cut and next_cut < first_impossible_cut:
+            shifted.append((next_cut, 1))
+            next_cut += 1
+        # general case: an external cut position i generates an internal cut position i+1
+        for start, length in external_cuts:
+            start = max(start + 1, next_cut)
+            if start >= first_impossible_cut:
+                break
+            length = min(length, first_impossible_cut - start)
+            shifted.append((start, length))
+            next_cut = start + length
+        return self.__push_cuts__(cuts, shifted, current_value)
+
+    def __compute_left_cuts__(self):
+        """Computes internal left cut intervals and bottom left value
+
+        Returns:
+            int: the maximal value obtained in the last cell of the first column
+        """
+        delta = min(max(0, self.Vnw - self.Vn), max(0, self.Vw - self.Vn))
+        minus_one_cut = self.Vw == self.Vnw + 1 or self.Vw == sys.maxsize
+        return self.__shift_cuts__(
+            self.leftmost_cuts, self.v_cuts, delta, minus_one_cut, self.height
+        )
+
+    def __compute_top_cuts__(self):
+        """Computes internal top cut intervals and top right value
+
+        Returns:
+            int: the maximal value obtained in the last cell of the first row
+        """
+        delta = min(max(0, self.Vnw - self.Vw), max(0, self.Vn - self.Vw))
+        minus_one_cut = self.Vn == self.Vnw + 1
+        return self.__shift_cuts__(
+            self.top_cuts, self.h_cuts, delta, minus_one_cut, self.width
+        )
+
+
 def random_tests(nb_tests: int):
 
     # brut force tests:
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Searches many patterns in one text with DtwByBlocks
+    The text is run-length encoded once, so that run boundaries and run letters
+    are not re-derived for each pattern. DtwByBlocks keeps no other state that
+    depends on the text only: there is nothing else to compile.
+"""
+
+__author__ = "Garance Gourdel, Pierre Peterlongo"
+__email__ = "pierre.peterlongo@inria.fr, garance.gourdel@inria.fr"
+
+import sys
+
+from .DTW_blocks import DtwByBlocks
+from .runs import RunLengthSequence
+
+
+def search(pattern, text, max_value=sys.maxsize, cut_intervals=False):
+    """Best occurrence of a pattern in a text
+
+    Args:
+        pattern (str or RunLengthSequence): pattern P
+        text (str or RunLengthSequence): text T
+        max_value (int): maximal value to be computed in the matrix
+        cut_intervals (bool): see DtwByBlocks
+
+    Returns:
+        (int, int): see DtwByBlocks.best_occurrence: minimal distance and its
+            first end position in T (0-based)
+    """
+    dtw = DtwByBlocks(
+        pattern, text, max_value, cut_intervals=cut_intervals, mode="last_row"
+    )
+    return dtw.best_occurrence()
+
+
+def search_many(patterns, text, max_value=sys.maxsize, cut_intervals=False):
+    """Best occurrence of each pattern in a text (see search)
+
+    Args:
+        patterns (iterable<str or RunLengthSequence>): patterns
+        text (str or RunLengthSequence): text, run-length encoded once if it is not
+        max_value (int): maximal value to be computed in the matrices
+
+    Yields:
+        (int, int): minimal distance and its first end position, for each pattern in order
+    """
+    if not isinstance(text, RunLengthSequence):
+        text = RunLengthSequence.from_string(text)
+    for pattern in patterns:
+        yield search(pattern, text, max_value, cut_intervals)
+
+
+def main(T, *patterns):
+    text = RunLengthSequence.from_string(T)
+    for P, (value, position) in zip(patterns, search_many(patterns, text)):
+        print(f"{P}: cost {value} for an occurrence ending at {position} in T")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3:
+        main(sys.argv[1], *sys.argv[2:])
+    else:
+        sys.stderr.write(f"Usage: python {sys.argv[0]} T P1 <P2 ...>\n")
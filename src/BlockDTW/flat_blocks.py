@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Computes a matrix of DTW distances between a pattern P and a text T
+    Same algorithm as DTW_blocks, without instantiating one Block object per block.
+    Block corners are stored in flat typed arrays indexed by block id and
+    the cuts of all blocks are stored in a single shared pool.
+    Computations of a block is in O(height + width).
+"""
+
+__author__ = "Garance Gourdel, Pierre Peterlongo"
+__email__ = "pierre.peterlongo@inria.fr, garance.gourdel@inria.fr"
+
+import sys
+from array import array
+
+from .block import bottom_cuts, left_cuts, right_cuts, top_cuts
+
+
+class FlatDtwByBlocks:
+    """
+    Computes the DTW matrix for a pattern P and a text T in O(#runsP |T| + |P| #runsT) time and space.
+    Struct-of-arrays counterpart of DtwByBlocks: a block is an id, not an object.
+    """
+
+    def __init__(self, P, T, max_value=sys.maxsize):
+        """Init and compute a DTW matrix
+
+        Block (v_block_id, h_block_id) has id h_block_id * #runsP + v_block_id.
+        Its four corners are stored in self.tl, self.tr, self.bl and self.br.
+        Its bottom (resp. right) cuts are
+        self.cut_pool[self.bottom_start[id]: self.bottom_start[id] + self.bottom_len[id]]
+        (resp. right_start and right_len).
+
+        Here a match is considered a 0 and a mismatch as 1.
+        Args:
+            P ([str]): Pattern string -> vertical in the matrix
+            T ([str]): target string -> horizontal in the matrix
+            max_value (int): maximal value to be computed in the matrix
+        """
+        self.P = P
+        self.T = T
+        self.max_value = max_value
+
+        self.end_vertical_blocks = []
+        for i in range(1, len(self.T)):
+            if self.T[i] != self.T[i - 1]:
+                self.end_vertical_blocks.append(i - 1)
+        self.end_vertical_blocks.append(len(self.T) - 1)
+
+        self.end_horizontal_blocks = []
+        for i in range(1, len(self.P)):
+            if self.P[i] != self.P[i - 1]:
+                self.end_horizontal_blocks.append(i - 1)
+        self.end_horizontal_blocks.append(len(self.P) - 1)
+
+        nb_blocks = self.get_nb_blocks()
+        self.bottom_start = array("q", bytes(8 * nb_blocks))
+        self.bottom_len = array("q", bytes(8 * nb_blocks))
+        self.right_start = array("q", bytes(8 * nb_blocks))
+        self.right_len = array("q", bytes(8 * nb_blocks))
+        self.cut_pool = array("q")
+
+        self.__compute_blocks__()
+
+    def get_br_value(self):
+        return self.br[-1]
+
+    def get_nb_blocks(self):
+        return len(self.end_horizontal_blocks) * len(self.end_vertical_blocks)
+
+    def get_bottom_cuts(self, block_id):
+        start = self.bottom_start[block_id]
+        return self.cut_pool[start : start + self.bottom_len[block_id]].tolist()
+
+    def get_right_cuts(self, block_id):
+        start = self.right_start[block_id]
+        return self.cut_pool[start : start + self.right_len[block_id]].tolist()
+
+    def __compute_blocks__(self):
+        """Compute all blocks from a matrix, column of blocks by column of blocks
+
+        Corners are accumulated in lists (faster item access in the loop) and
+        frozen into typed arrays at the end. Cuts of the previous column of
+        blocks are kept at hand so that the pool is only appended to.
+        """
+        maxsize = sys.maxsize
+        max_value = self.max_value
+        tl_a, tr_a, bl_a, br_a = [], [], [], []
+        tl_append, tr_append = tl_a.append, tr_a.append
+        bl_append, br_append = bl_a.append, br_a.append
+        bottom_start, bottom_len = self.bottom_start, self.bottom_len
+        right_start, right_len = self.right_start, self.right_len
+        pool = self.cut_pool
+        nb_rows = len(self.end_horizontal_blocks)
+
+        P_letters = [self.P[line_end] for line_end in self.end_horizontal_blocks]
+        heights = []
+        line_start = 0
+        for line_end in self.end_horizontal_blocks:
+            heights.append(line_end - line_start + 1)
+            line_start = line_end + 1
+
+        # values and cuts on the left of the first column of blocks
+        W_values = [maxsize] * nb_rows
+        NW_values = [0] + [maxsize] * (nb_rows - 1)
+        W_cuts = [range(height) for height in heights]
+
+        col_start = 0
+        for col_end in self.end_vertical_blocks:
+            width = col_end - col_start + 1
+            T_letter = self.T[col_end]
+            current_cuts = []
+            cuts_append = current_cuts.append
+            Vn = 0  # first row of the matrix
+            h_cuts = ()  # first row of the matrix, no cuts above
+            for P_letter, height, Vw, Vnw, v_cuts in zip(
+                P_letters, heights, W_values, NW_values, W_cuts
+            ):
+                tl = Vnw if Vnw < Vw else Vw
+                if Vn < tl:
+                    tl = Vn
+                if P_letter == T_letter:
+                    # constant block without cuts
+                    tr = bl = br = tl
+                    h_cuts = right = ()
+                else:
+                    tl += 1
+                    if tl >= max_value:
+                        tl = max_value
+                    if tl == max_value or (height == 1 and width == 1):
+                        tr = bl = br = tl
+                        h_cuts = right = ()
+                    elif width == 1:
+                        right, bl = left_cuts(height, tl, Vnw, Vw, Vn, v_cuts, max_value)
+                        tr = tl
+                        br = bl
+                        h_cuts = ()
+                    elif height == 1:
+                        h_cuts, tr = top_cuts(width, tl, Vnw, Vw, Vn, h_cuts, max_value)
+                        bl = tl
+                        br = tr
+                        right = ()
+                    else:
+                        leftmost, bl = left_cuts(
+                            height, tl, Vnw, Vw, Vn, v_cuts, max_value
+                        )
+                        top, tr = top_cuts(width, tl, Vnw, Vw, Vn, h_cuts, max_value)
+                        h_cuts, br = bottom_cuts(
+                            height, width, bl, tr, leftmost, top, max_value
+                        )
+                        right, _ = right_cuts(
+                            height, width, tr, leftmost, top, max_value
+                        )
+                    block_id = len(tl_a)
+                    if h_cuts:
+                        bottom_start[block_id] = len(pool)
+                        bottom_len[block_id] = len(h_cuts)
+                        pool.extend(h_cuts)
+                    if right:
+                        right_start[block_id] = len(pool)
+                        right_len[block_id] = len(right)
+                        pool.extend(right)
+                tl_append(tl)
+                tr_append(tr)
+                bl_append(bl)
+                br_append(br)
+                cuts_append(right)
+                Vn = bl
+            W_values = tr_a[-nb_rows:]
+            NW_values = [0] + br_a[-nb_rows:-1]
+            W_cuts = current_cuts
+            col_start = col_end + 1
+
+        self.tl = array("q", tl_a)
+        self.tr = array("q", tr_a)
+        self.bl = array("q", bl_a)
+        self.br = array("q", br_a)
+
+
+def main(P, T, max_value=sys.maxsize):
+    """Computes a dtw matrix
+
+    Args:
+        P ([str]): pattern
+        T ([str]): target
+    """
+    dtw = FlatDtwByBlocks(P, T, max_value)
+    print(f"bottom right value {dtw.get_br_value()}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        main(sys.argv[1], sys.argv[2])
+    elif len(sys.argv) == 4:
+        main(sys.argv[1], sys.argv[2], int(sys.argv[3]))
+    else:
+        sys.stderr.write(f"Usage: python {sys.argv[0]} P T <max_value>\n")
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Cascade of lower bounds of the pattern matching DTW distance of P in T
+    Each stage computes, in O(|P| + |T|), a lower bound of the distance of the best
+    occurrence of P in T. A (P, T) pair is pruned by the first stage whose bound
+    reaches max_value, before any exact computation. Stages are functions
+    (P, T) -> (lower bound, exact), exact being True when the bound is the distance.
+"""
+
+__author__ = "Garance Gourdel, Pierre Peterlongo"
+__email__ = "pierre.peterlongo@inria.fr, garance.gourdel@inria.fr"
+
+import sys
+
+from dynamic_prog.pattern_matching import PM_DTW
+from .DTW_blocks import DtwByBlocks
+from .runs import RunLengthSequence
+
+
+def homopolymer_compress(S):
+    """S without its repeated letters (one letter per run)"""
+    if len(S) == 0:
+        return ""
+    return "".join(RunLengthSequence.from_string(S).letters)
+
+
+def run_counts(S):
+    """Number of runs of each letter of S"""
+    counts = {}
+    for i, letter in enumerate(S):
+        if i == 0 or S[i - 1] != letter:
+            counts[letter] = counts.get(letter, 0) + 1
+    return counts
+
+
+def compressed_substring_bound(P, T):
+    """The distance is 0 if and only if the compressed P is a substring of the compressed T
+
+    A path of cost 0 only crosses blocks of matches: it aligns the runs of P with
+    consecutive runs of T.
+    """
+    if homopolymer_compress(P) in homopolymer_compress(T):
+        return 0, True
+    return 1, False
+
+
+def absent_letters_bound(P, T):
+    """Number of positions of P whose letter does not occur in T
+
+    The path crosses each line of the matrix, and all cells of the line of such a
+    position are mismatches.
+    """
+    letters = set(T)
+    return sum(1 for letter in P if letter not in letters), False
+
+
+def run_counts_bound(P, T):
+    """Largest excess of runs of a letter in P as compared to T
+
+    Two runs of a letter of P aligned with the same run of T are separated by
+    lines of mismatches, and a run of P aligned with no run of its letter costs
+    at least one. These costs may be shared between letters: bounds of letters
+    are not summed.
+    """
+    T_counts = run_counts(T)
+    bound = 0
+    for letter, count in run_counts(P).items():
+        bound = max(bound, count - T_counts.get(letter, 0))
+    return bound, False
+
+
+def absent_transitions_bound(P, T):
+    """Half the number of transitions between two runs of P that do not occur in T
+
+    If the transition from a run of a to a run of b does not occur in T, the last cell
+    of the path on the line of a or its first cell on the line of b is a mismatch.
+    Such a cell is shared by at most two transitions (the ones above and below it).
+    """
+    compressed_P = homopolymer_compress(P)
+    compressed_T = homopolymer_compress(T)
+    transitions = {compressed_T[i : i + 2] for i in range(len(compressed_T) - 1)}
+    nb_absent = 0
+    for i in range(len(compressed_P) - 1):
+        if compressed_P[i : i + 2] not in transitions:
+            nb_absent += 1
+    return (nb_absent + 1) // 2, False
+
+
+default_stages = (
+    ("compressed substring", compressed_substring_bound),
+    ("absent letters", absent_letters_bound),
+    ("run counts", run_counts_bound),
+    ("absent transitions", absent_transitions_bound),
+)
+
+
+def blocks_distance(P, T, max_value):
+    """Exact distance of the best occurrence of P in T with DtwByBlocks"""
+    return DtwByBlocks(P, T, max_value, mode="last_row").best_occurrence()[0]
+
+
+def pm_dtw_distance(P, T, max_value):
+    """Exact distance of the best occurrence of P in T with PM_DTW"""
+    ldtw = PM_DTW(P, T, mode="last_row", max_value=max_value)
+    return min(ldtw.min_last_row_val_index()[0], max_value)
+
+
+def bitparallel_distance(P, T, max_value):
+    """Exact distance of the best occurrence of P in T with the bitparallel engine of PM_DTW"""
+    ldtw = PM_DTW(P, T, "bitparallel", "last_row", max_value)
+    return min(ldtw.min_last_row_val_index()[0], max_value)
+
+
+exact_engines = {
+    "blocks": blocks_distance,
+    "dtw": pm_dtw_distance,
+    "bitparallel": bitparallel_distance,
+}
+
+
+class LowerBoundCascade:
+    """
+    Filters (P, T) pairs with a sequence of lower bounds, and counts the pairs
+    pruned (or resolved, when a bound is exact) by each stage.
+    """
+
+    def __init__(self, stages=default_stages, engine="blocks"):
+        """
+        Args:
+            stages (iterable<(str, function)>): name and function of each stage,
+                a function returns a lower bound of the distance and whether it is exact
+            engine (str): exact engine run on pairs that are not pruned, "blocks"
+                (DtwByBlocks), "dtw" (PM_DTW) or "bitparallel" (PM_DTW with its
+                bitparallel engine)
+        """
+        if engine not in exact_engines:
+            raise ValueError(
+                f"Unknown engine {engine}, expected one of {tuple(exact_engines)}"
+            )
+        self.stages = list(stages)
+        self.exact_distance = exact_engines[engine]
+        self.nb_pairs = 0
+        self.nb_computed = 0
+        # for each stage, number of pairs tested, pruned and resolved
+        self.nb_tested = [0] * len(self.stages)
+        self.nb_pruned = [0] * len(self.stages)
+        self.nb_resolved = [0] * len(self.stages)
+
+    def lower_bound(self, P, T, max_value):
+        """Runs the stages until one of them prunes or resolves the pair
+
+        Returns:
+            (int, bool): best lower bound found and whether it is the distance,
+                the bound is >= max_value if the pair is pruned
+        """
+        self.nb_pairs += 1
+        bound = 0
+        for stage, (_, function) in enumerate(self.stages):
+            self.nb_tested[stage] += 1
+            stage_bound, exact = function(P, T)
+            bound = max(bound, stage_bound)
+            if bound >= max_value:
+                self.nb_pruned[stage] += 1
+                return bound, False
+            if exact:
+                self.nb_resolved[stage] += 1
+                return bound, True
+        return bound, False
+
+    def distance(self, P, T, max_value=sys.maxsize):
+        """Distance of the best occurrence of P in T, the exact engine being run
+        only on pairs that are neither pruned nor resolved by a stage
+
+        Returns:
+            int: distance, values >= max_value are reported as max_value
+        """
+        bound, exact = self.lower_bound(P, T, max_value)
+        if bound >= max_value:
+            return max_value
+        if exact:
+            return bound
+        self.nb_computed += 1
+        return self.exact_distance(P, T, max_value)
+
+    def filter(self, pairs, max_value):
+        """Pairs whose distance may be lower than max_value
+
+        Yields:
+            (str, str): each (P, T) pair which is not pruned, in order
+        """
+        for P, T in pairs:
+            if self.lower_bound(P, T, max_value)[0] < max_value:
+                yield P, T
+
+    def prune_rates(self):
+        """Fraction of the pairs tested by each stage that it pruned
+
+        Returns:
+            list<(str, int, float)>: name, number of tested pairs and prune rate of each stage
+        """
+        return [
+            (name, tested, pruned / tested if tested > 0 else 0)
+            for (name, _), tested, pruned in zip(
+                self.stages, self.nb_tested, self.nb_pruned
+            )
+        ]
+
+    def report(self):
+        res = f"{self.nb_pairs} pairs, {self.nb_computed} exact computations\n"
+        for stage, (name, tested, rate) in enumerate(self.prune_rates()):
+            res += f" {name}: {tested} tested, {self.nb_pruned[stage]} pruned ({round(100 * rate, 2)}%)"
+            res += f", {self.nb_resolved[stage]} resolved\n"
+        return res
+
+
+def main(P, T, max_value=sys.maxsize):
+    cascade = LowerBoundCascade()
+    print(f"distance {cascade.distance(P, T, max_value)}")
+    print(cascade.report())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        main(sys.argv[1], sys.argv[2])
+    elif len(sys.argv) == 4:
+        main(sys.argv[1], sys.argv[2], int(sys.argv[3]))
+    else:
+        sys.stderr.write(f"Usage: python {sys.argv[0]} P T <max_value>\n")
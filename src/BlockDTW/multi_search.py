@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Searches the k best occurrences of a pattern in a multi-fasta reference
+    Contigs are read and searched one by one. The k best hits found so far are kept
+    in a heap, and the k-th best distance is the max_value of the DtwByBlocks of the
+    following contigs: the more good hits are found, the more blocks are pruned.
+"""
+
+__author__ = "Garance Gourdel, Pierre Peterlongo"
+__email__ = "pierre.peterlongo@inria.fr, garance.gourdel@inria.fr"
+
+import heapq
+import sys
+
+from .DTW_blocks import DtwByBlocks
+
+
+def read_fasta(file_name):
+    """Reads a (multi-)fasta file, one contig at a time
+
+    Yields:
+        (str, str): name (first word of the header) and sequence of each contig
+    """
+    name = None
+    lines = []
+    with open(file_name) as fasta:
+        for line in fasta:
+            line = line.strip()
+            if line.startswith(">"):
+                if name is not None:
+                    yield name, "".join(lines)
+                name = line[1:].split()[0] if len(line) > 1 else ""
+                lines = []
+            elif line:
+                lines.append(line)
+    if name is not None:
+        yield name, "".join(lines)
+
+
+def top_k_hits(
+    P, contigs, k, max_value=sys.maxsize, min_distance=None, cut_intervals=False
+):
+    """k best non overlapping occurrences of P in a set of contigs
+
+    Hits of a contig are considered by increasing distance (then position), and a
+    hit is suppressed if a better hit of the same contig ends less than
+    min_distance positions away. Ties are won by the first contig.
+
+    Args:
+        P (str): pattern
+        contigs (iterable<(str, str)>): name and sequence of each contig, e.g. read_fasta(file)
+        k (int): number of hits
+        max_value (int): hits of distance >= max_value are not reported
+        min_distance (int): minimal distance between the end positions of two hits
+            of a same contig, default |P|
+        cut_intervals (bool): see DtwByBlocks
+
+    Returns:
+        list<(str, int, int)>: contig, end position (0-based) and distance of each hit,
+            by increasing distance
+    """
+    if k < 1:
+        raise ValueError(f"The number of hits must be positive, not {k}")
+    if min_distance is None:
+        min_distance = len(P)
+    # max heap of the k best hits: the worst one (then the last found) is on top
+    heap = []
+    nb_hits = 0
+    for name, sequence in contigs:
+        if len(sequence) == 0:
+            continue
+        threshold = max_value
+        if len(heap) == k:
+            threshold = min(threshold, -heap[0][0])
+        if threshold <= 0:
+            break  # k hits of distance 0 were found
+        dtw = DtwByBlocks(
+            P, sequence, threshold, cut_intervals=cut_intervals, mode="last_row"
+        )
+        accepted = []  # end positions of the hits of this contig
+        for position, distance in sorted(
+            dtw.iter_occurrences(), key=lambda hit: (hit[1], hit[0])
+        ):
+            if len(heap) == k and distance >= -heap[0][0]:
+                break
+            if any(abs(position - end) < min_distance for end in accepted):
+                continue
+            accepted.append(position)
+            nb_hits += 1
+            hit = (-distance, -nb_hits, name, position)
+            if len(heap) < k:
+                heapq.heappush(heap, hit)
+            else:
+                heapq.heapreplace(heap, hit)
+    return [
+        (name, position, -distance)
+        for distance, _, name, position in sorted(heap, reverse=True)
+    ]
+
+
+def main(reference_file, P, k, max_value=sys.maxsize):
+    for name, position, distance in top_k_hits(P, read_fasta(reference_file), k, max_value):
+        print(f"{name}: cost {distance} for an occurrence ending at {position}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4:
+        main(sys.argv[1], sys.argv[2], int(sys.argv[3]))
+    elif len(sys.argv) == 5:
+        main(sys.argv[1], sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
+    else:
+        sys.stderr.write(f"Usage: python {sys.argv[0]} reference.fa P k <max_value>\n")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Run-length encoded sequences
+    A sequence is stored as its runs: one letter and one length per run.
+    Run ends are computed once, so that a text (e.g. a homopolymer compressed
+    reference) can be queried several times without re-deriving its runs.
+"""
+
+__author__ = "Garance Gourdel, Pierre Peterlongo"
+__email__ = "pierre.peterlongo@inria.fr, garance.gourdel@inria.fr"
+
+import sys
+from bisect import bisect_left
+
+
+class RunLengthSequence:
+    """Sequence given by its runs, usable as P or T in DtwByBlocks"""
+
+    def __init__(self, letters, lengths):
+        """Init a run-length encoded sequence
+
+        Two consecutive runs may have the same letter, they are then processed as two blocks.
+        Args:
+            letters (sequence): letter of each run (str, list, or an array of letter codes)
+            lengths (sequence<int>): length of each run (list, array('I'), NumPy array...), all > 0
+        """
+        if len(letters) != len(lengths):
+            raise ValueError(
+                f"{len(letters)} letters given for {len(lengths)} run lengths"
+            )
+        self.letters = list(letters)
+        self.lengths = [int(length) for length in lengths]
+        # ends[r] is the position of the last letter of run r
+        self.ends = []
+        position = -1
+        for length in self.lengths:
+            if length <= 0:
+                raise ValueError(f"Run lengths must be positive, got {length}")
+            position += length
+            self.ends.append(position)
+
+    @classmethod
+    def from_string(cls, S):
+        """Run-length encoding of a string
+
+        Args:
+            S (str): a sequence
+
+        Returns:
+            RunLengthSequence: runs of S
+        """
+        letters = []
+        lengths = []
+        for letter in S:
+            if letters and letters[-1] == letter:
+                lengths[-1] += 1
+            else:
+                letters.append(letter)
+                lengths.append(1)
+        return cls(letters, lengths)
+
+    def __len__(self):
+        if not self.ends:
+            return 0
+        return self.ends[-1] + 1
+
+    def __getitem__(self, position):
+        """Letter at a position of the decoded sequence, in O(log #runs)"""
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(f"Position {position} out of the sequence")
+        return self.letters[bisect_left(self.ends, position)]
+
+    def __repr__(self):
+        return "".join(
+            f"{letter}{length}" for letter, length in zip(self.letters, self.lengths)
+        )
+
+    def get_nb_runs(self):
+        return len(self.lengths)
+
+    def decode(self):
+        """Decoded sequence (letters must be strings)
+
+        Returns:
+            str: the sequence, each letter repeated its run length
+        """
+        return "".join(
+            letter * length for letter, length in zip(self.letters, self.lengths)
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2:
+        print(RunLengthSequence.from_string(sys.argv[1]))
+    else:
+        sys.stderr.write(f"Usage: python {sys.argv[0]} S\n")
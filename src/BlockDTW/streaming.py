@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Pattern matching DTW of a pattern P in a text T given as a stream of chunks
+    T is never stored: its runs are computed one by one as the chunks arrive, and
+    only the last column of blocks (one block per run of P) is kept. The occurrences
+    ending in a run of T are final as soon as the run is over.
+"""
+
+__author__ = "Garance Gourdel, Pierre Peterlongo"
+__email__ = "pierre.peterlongo@inria.fr, garance.gourdel@inria.fr"
+
+import sys
+
+from .DTW_blocks import DtwByBlocks
+from .runs import RunLengthSequence
+
+
+class StreamingDtwByBlocks(DtwByBlocks):
+    """
+    Pattern matching DTW of P in a text fed by chunks, in O(#runsP) memory
+    (plus the cuts of the blocks of the current column).
+    """
+
+    def __init__(self, P, max_value=sys.maxsize, cut_intervals=False):
+        """Init the matching of P in an empty text
+
+        Args:
+            P ([str] or RunLengthSequence): Pattern string -> vertical in the matrix
+            max_value (int): maximal value to be computed in the matrix,
+                occurrences of distance >= max_value are not reported
+            cut_intervals (bool): see DtwByBlocks
+        """
+        super().__init__(
+            P, RunLengthSequence([], []), max_value, cut_intervals, mode="distance"
+        )
+        # letter and length of the current run of T, not computed until it is over
+        self.pending_letter = None
+        self.pending_length = 0
+        # number of letters of T whose column of blocks is computed
+        self.length = 0
+        self.nb_runs = 0
+
+    def get_nb_blocks(self):
+        return len(self.end_horizontal_blocks) * self.nb_runs
+
+    def __push_run__(self, letter, length, hits):
+        """Computes the column of blocks of a run of T
+
+        Appends to hits the (end position in T, distance) of the occurrences
+        ending in the run, of distance lower than max_value.
+        """
+        # only the end of the previous run and the end of this run are kept
+        self.end_vertical_blocks = [self.length - 1, self.length + length - 1]
+        self.T_letters = [None, letter]
+        self.last_column = self.__compute_column__(1, self.last_column)
+        col_start = self.length
+        self.length += length
+        self.nb_runs += 1
+        if len(self.last_column) < len(self.end_horizontal_blocks):
+            return  # the last block of the column is saturated
+        block = self.last_column[-1]
+        if block is None or block.bl >= self.max_value:
+            return  # values only increase along a block
+        for x, value in enumerate(block.bottom_values()):
+            if value >= self.max_value:
+                break
+            hits.append((col_start + x, value))
+
+    def feed(self, chunk):
+        """Adds a chunk to the end of T and computes the runs of T it ends
+
+        The last run of the chunk may go on in the next chunk: occurrences ending
+        in it are only reported by a following call to feed or close.
+
+        Returns:
+            list<(int, int)>: (end position in T, distance) of the occurrences of distance
+                lower than max_value which became final, by increasing position
+        """
+        hits = []
+        for letter in chunk:
+            if letter == self.pending_letter:
+                self.pending_length += 1
+                continue
+            if self.pending_length > 0:
+                self.__push_run__(self.pending_letter, self.pending_length, hits)
+            self.pending_letter = letter
+            self.pending_length = 1
+        return hits
+
+    def close(self):
+        """Ends T and computes its last run
+
+        Returns:
+            list<(int, int)>: (end position in T, distance) of the occurrences ending in
+                the last run of T, of distance lower than max_value
+        """
+        hits = []
+        if self.pending_length > 0:
+            self.__push_run__(self.pending_letter, self.pending_length, hits)
+        self.pending_letter = None
+        self.pending_length = 0
+        return hits
+
+
+def iter_stream_occurrences(P, chunks, max_value=sys.maxsize, cut_intervals=False):
+    """Occurrences of P in a text given by chunks, as DtwByBlocks.iter_occurrences
+
+    Args:
+        P ([str] or RunLengthSequence): pattern
+        chunks (iterable<str>): consecutive chunks of T, e.g. lines of a file
+        max_value (int): occurrences of distance >= max_value are not reported
+        cut_intervals (bool): see DtwByBlocks
+
+    Yields:
+        (int, int): (end position in T, distance), by increasing position,
+            as soon as the run of T where the occurrence ends is over
+    """
+    matcher = StreamingDtwByBlocks(P, max_value, cut_intervals)
+    for chunk in chunks:
+        yield from matcher.feed(chunk)
+    yield from matcher.close()
+
+
+def main(P, max_value=sys.maxsize):
+    """Reports the occurrences of P in a text read from the standard input"""
+    chunks = (line.strip() for line in sys.stdin if not line.startswith(">"))
+    for position, distance in iter_stream_occurrences(P, chunks, max_value):
+        print(f"cost {distance} for an occurrence ending at {position}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2:
+        main(sys.argv[1])
+    elif len(sys.argv) == 3:
+        main(sys.argv[1], int(sys.argv[2]))
+    else:
+        sys.stderr.write(f"Usage: python {sys.argv[0]} P <max_value> < T.txt\n")
@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Computes the DTW distance between a pattern P and a text T with a wavefront of tiles
+    The grid of blocks is cut into tiles of tile_height runs of P x tile_width runs of T.
+    A tile only needs the last row of blocks of the tile above, the last column of
+    blocks of the tile on its left and the bottom right value of the tile above left:
+    all tiles of an anti-diagonal are independent and are computed in parallel.
+    Only the borders of the tiles are kept, as BorderBlock pseudo blocks.
+"""
+
+__author__ = "Garance Gourdel, Pierre Peterlongo"
+__email__ = "pierre.peterlongo@inria.fr, garance.gourdel@inria.fr"
+
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .DTW_blocks import BorderBlock, DtwByBlocks
+from .runs import RunLengthSequence
+
+executors = ("process", "thread", "serial")
+
+
+class TileDtwByBlocks(DtwByBlocks):
+    """DtwByBlocks of a tile of the matrix, whose line above and column on the left are given"""
+
+    def __init__(self, P, T, top_border, left_border, max_value, cut_intervals):
+        """
+        Args:
+            P (RunLengthSequence): runs of P of the tile
+            T (RunLengthSequence): runs of T of the tile
+            top_border (list<BorderBlock>): blocks above the tile, the first one being the top left corner
+            left_border (list<BorderBlock>): blocks on the left of the tile
+        """
+        self.top_border = top_border
+        self.given_left_border = left_border
+        super().__init__(P, T, max_value, cut_intervals=cut_intervals, mode="last_row")
+
+    def __top_border__(self, h_block_id):
+        return self.top_border[h_block_id + 1]
+
+    def __left_border__(self):
+        return self.given_left_border
+
+
+def as_border(block, saturated_border):
+    """Borders of a block as a (lighter) BorderBlock, saturated if the block was not computed"""
+    if block is None:
+        return saturated_border
+    return BorderBlock(
+        bl=block.bl,
+        tr=block.tr,
+        br=block.br,
+        bottom_cuts=block.bottom_cuts,
+        rightmost_cuts=block.rightmost_cuts,
+    )
+
+
+def compute_tile(P, T, top_border, left_border, max_value, cut_intervals):
+    """Computes a tile (see TileDtwByBlocks)
+
+    Returns:
+        (list<BorderBlock>, list<BorderBlock>, int): last row and last column of blocks of
+            the tile and the number of computed blocks
+    """
+    tile = TileDtwByBlocks(P, T, top_border, left_border, max_value, cut_intervals)
+    saturated_border = tile.saturated_border
+    bottom = [as_border(block, saturated_border) for block in tile.last_row]
+    right = [as_border(block, saturated_border) for block in tile.last_column]
+    right += [saturated_border] * (P.get_nb_runs() - len(right))
+    return bottom, right, tile.nb_computed_blocks
+
+
+class WavefrontDtwByBlocks:
+    """
+    Computes the DTW distance for a pattern P and a text T, anti-diagonal of tiles by anti-diagonal of tiles.
+    """
+
+    def __init__(
+        self,
+        P,
+        T,
+        max_value=sys.maxsize,
+        cut_intervals=False,
+        tile_height=64,
+        tile_width=64,
+        executor="process",
+        workers=None,
+    ):
+        """Init and compute the DTW distance
+
+        Args:
+            P ([str] or RunLengthSequence): Pattern string -> vertical in the matrix
+            T ([str] or RunLengthSequence): target string -> horizontal in the matrix
+            max_value (int): maximal value to be computed in the matrix
+            cut_intervals (bool): see DtwByBlocks
+            tile_height (int): number of runs of P per tile
+            tile_width (int): number of runs of T per tile
+            executor (str): "process" or "thread" pool, or "serial" (for debugging)
+            workers (int): number of workers of the pool, default: number of CPUs
+        """
+        if executor not in executors:
+            raise ValueError(
+                f"Unknown executor {executor}, expected one of {executors}"
+            )
+        if not isinstance(P, RunLengthSequence):
+            P = RunLengthSequence.from_string(P)
+        if not isinstance(T, RunLengthSequence):
+            T = RunLengthSequence.from_string(T)
+        self.P = P
+        self.T = T
+        self.max_value = max_value
+        self.cut_intervals = cut_intervals
+        self.tile_height = tile_height
+        self.tile_width = tile_width
+        self.nb_computed_blocks = 0
+
+        # runs of P (resp. T) of each row (resp. column) of tiles
+        self.P_tiles = self.__split__(P, tile_height)
+        self.T_tiles = self.__split__(T, tile_width)
+
+        if executor == "serial":
+            self.__compute_tiles__(None)
+        else:
+            if executor == "process":
+                pool_class = ProcessPoolExecutor
+            else:
+                pool_class = ThreadPoolExecutor
+            with pool_class(workers) as pool:
+                self.__compute_tiles__(pool)
+
+    @staticmethod
+    def __split__(S, nb_runs):
+        return [
+            RunLengthSequence(S.letters[i : i + nb_runs], S.lengths[i : i + nb_runs])
+            for i in range(0, S.get_nb_runs(), nb_runs)
+        ]
+
+    def get_br_value(self):
+        return self.last_column[-1].br
+
+    def get_nb_blocks(self):
+        return self.P.get_nb_runs() * self.T.get_nb_runs()
+
+    def __left_tile_border__(self, P_tile):
+        """Column on the left of the matrix, for a row of tiles (see DtwByBlocks.__left_border__)"""
+        border = []
+        for height in P_tile.lengths:
+            if self.cut_intervals:
+                cuts = [(0, height)]
+            else:
+                cuts = [i for i in range(height)]
+            border.append(
+                BorderBlock(
+                    bl=sys.maxsize,
+                    tr=sys.maxsize,
+                    br=sys.maxsize,
+                    bottom_cuts=[],
+                    rightmost_cuts=cuts,
+                )
+            )
+        return border
+
+    def __tile_top__(self, a, b, borders):
+        """Blocks above tile (a, b), the first one being its top left corner"""
+        if a == 0:
+            zero = BorderBlock(bl=0, tr=0, br=0, bottom_cuts=[], rightmost_cuts=[])
+            return [zero] * (self.T_tiles[b].get_nb_runs() + 1)
+        if b == 0:
+            corner = self.__left_tile_border__(self.P_tiles[a - 1])[-1]
+        else:
+            corner = borders[(a - 1, b - 1)][0][-1]
+        return [corner] + borders[(a - 1, b)][0]
+
+    def __tile_left__(self, a, b, borders):
+        """Blocks on the left of tile (a, b)"""
+        if b == 0:
+            return self.__left_tile_border__(self.P_tiles[a])
+        return borders[(a, b - 1)][1]
+
+    def __compute_tiles__(self, pool):
+        """Computes all tiles, anti-diagonal by anti-diagonal
+
+        The borders of a tile are read by the tiles of the two next anti-diagonals
+        (below, on the right, and below right for the corner), then dropped.
+        """
+        borders = {}  # (a, b) -> (last row, last column) of blocks of tile (a, b)
+        nb_rows = len(self.P_tiles)
+        nb_columns = len(self.T_tiles)
+        for diagonal in range(nb_rows + nb_columns - 1):
+            tiles = [
+                (a, diagonal - a)
+                for a in range(
+                    max(0, diagonal - nb_columns + 1), min(nb_rows, diagonal + 1)
+                )
+            ]
+            arguments = [
+                (
+                    self.P_tiles[a],
+                    self.T_tiles[b],
+                    self.__tile_top__(a, b, borders),
+                    self.__tile_left__(a, b, borders),
+                    self.max_value,
+                    self.cut_intervals,
+                )
+                for a, b in tiles
+            ]
+            if pool is None:
+                results = [compute_tile(*argument) for argument in arguments]
+            else:
+                results = pool.map(compute_tile, *zip(*arguments))
+            for (a, b), (bottom, right, nb_computed_blocks) in zip(tiles, results):
+                borders[(a, b)] = (bottom, right)
+                self.nb_computed_blocks += nb_computed_blocks
+            for a in range(nb_rows):
+                borders.pop((a, diagonal - 2 - a), None)
+        self.last_column = borders[(nb_rows - 1, nb_columns - 1)][1]
+
+
+def main(P, T, max_value=sys.maxsize):
+    """Computes a dtw distance
+
+    Args:
+        P ([str]): pattern
+        T ([str]): target
+    """
+    dtw = WavefrontDtwByBlocks(P, T, max_value)
+    print(f"bottom right value {dtw.get_br_value()}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        main(sys.argv[1], sys.argv[2])
+    elif len(sys.argv) == 4:
+        main(sys.argv[1], sys.argv[2], int(sys.argv[3]))
+    else:
+        sys.stderr.write(f"Usage: python {sys.argv[0]} P T <max_value>\n")
@@ -0,0 +1,145 @@
+"""
+Bit-parallel computation of the last line of the pattern matching matrices of
+PM_ED and PM_DTW. Bit vectors are Python ints of |P| bits (bit i-1 for line i),
+so that patterns longer than a machine word need no blocking.
+Unit costs only: match 0, mismatch 1, gap 1.
+
+Edit distance: Myers 1999, as formulated by Hyyrö. A column is encoded by the
+bit vectors of its vertical differences (+1 in Pv, -1 in Mv).
+
+DTW: vertical differences of a column are at most 1 but are not bounded
+below, so a column is encoded by its level sets: levels[v] is the bit vector
+of the lines whose value is <= v.
+"""
+
+__author__ = "Garance Gourdel, Pierre Peterlongo"
+__email__ = "pierre.peterlongo@inria.fr, garance.gourdel@inria.fr"
+
+import sys
+
+
+def match_masks(P):
+    """For each letter of P, the bit vector of its positions in P (bit i for P[i])"""
+    masks = {}
+    for i, letter in enumerate(P):
+        masks[letter] = masks.get(letter, 0) | (1 << i)
+    return masks
+
+
+def ed_last_row(P, T):
+    """Last line of the PM_ED matrix of P (vertical) and T (horizontal)
+
+    Column 0 of PM_ED is infinite (but on line 0), so column 1 is
+    [0, c, c + 1, ..., c + |P| - 1] with c the cost of P[0] against T[0]:
+    it is the first column of the bit-parallel computation, whose following
+    columns are computed as in Myers' search algorithm (line 0 is made of zeros).
+
+    Returns:
+        list<int>: |T|+1 values, as PM_ED.get_last_row()
+    """
+    m = len(P)
+    if m == 0:
+        return [0 for j in range(len(T) + 1)]
+    last_row = [sys.maxsize]
+    if len(T) == 0:
+        return last_row
+    mask = (1 << m) - 1
+    high_bit = 1 << (m - 1)
+    masks = match_masks(P)
+
+    # column 1
+    first_cost = 0 if P[0] == T[0] else 1
+    Pv = (mask & ~1) | first_cost
+    Mv = 0
+    score = first_cost + m - 1
+    last_row.append(score)
+
+    for letter in T[1:]:
+        Eq = masks.get(letter, 0)
+        Xv = Eq | Mv
+        Xh = (((Eq & Pv) + Pv) ^ Pv) | Eq
+        Ph = Mv | (~(Xh | Pv) & mask)
+        Mh = Pv & Xh
+        if Ph & high_bit:
+            score += 1
+        elif Mh & high_bit:
+            score -= 1
+        # horizontal differences on line 0 are 0: nothing is shifted in
+        Ph = (Ph << 1) & mask
+        Mh = (Mh << 1) & mask
+        Pv = Mh | (~(Xv | Ph) & mask)
+        Mv = Ph & Xv
+        last_row.append(score)
+    return last_row
+
+
+def dtw_last_row(P, T, max_value=sys.maxsize):
+    """Last line of the PM_DTW matrix of P (vertical) and T (horizontal)
+
+    Level v of column j is derived from levels v - 1 and v of column j - 1 and
+    level v - 1 of column j: line i has a value <= v if
+    - P[i-1] == T[j-1] and a cell on its left, top left or top is <= v,
+    - P[i-1] != T[j-1] and a cell on its left, top left or top is <= v - 1.
+    Cells reached from the top through consecutive matches are found with a
+    carry propagating through the runs of matches.
+    Levels are computed until they contain all lines, or up to max_value - 1:
+    a column costs O(min(max_value, its maximal value) x |P| / w) word operations.
+
+    Returns:
+        list<int>: |T|+1 values, as PM_DTW.get_last_row(), values larger than
+            or equal to max_value are reported as max_value
+    """
+    m = len(P)
+    if m == 0:
+        return [0 for j in range(len(T) + 1)]
+    mask = (1 << m) - 1
+    high_bit = 1 << (m - 1)
+    masks = match_masks(P)
+
+    last_row = [sys.maxsize]
+    # column 0 is infinite but on line 0: no level contains a line
+    previous_levels = []
+    previous_full = 0
+    for letter in T:
+        Eq = masks.get(letter, 0)
+        NEq = mask & ~Eq
+        levels = []
+        value = max_value
+        below = 0  # level v - 1 of the current column
+        previous_below = 0  # lines of level v - 1 of the previous column, or reached from it
+        v = 0
+        while v < max_value:
+            if v < len(previous_levels):
+                previous = previous_levels[v]
+            else:
+                previous = previous_full
+            # lines whose top left or left cell is <= v (line 0 is made of zeros)
+            previous = (previous | (previous << 1) | 1) & mask
+            level = (Eq & previous) | (NEq & previous_below)
+            if v > 0:
+                # mismatches whose top cell is <= v - 1
+                level |= NEq & ((below << 1) | 1)
+            level &= mask
+            # matches whose top cell is <= v, through runs of matches
+            starts = ((level << 1) | 1) & Eq
+            level |= ((((starts + Eq) ^ Eq) | starts) & Eq)
+            levels.append(level)
+            if value == max_value and level & high_bit:
+                value = v
+            if level == mask:
+                break
+            below = level
+            previous_below = previous
+            v += 1
+        last_row.append(value)
+        previous_levels = levels
+        previous_full = mask if levels and levels[-1] == mask else 0
+    return last_row
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        print(ed_last_row(sys.argv[1], sys.argv[2]))
+        print(dtw_last_row(sys.argv[1], sys.argv[2]))
+    else:
+        sys.stderr.write(f"Usage: python {sys.argv[0]} P T\n")
@@ -0,0 +1,205 @@
+"""
+Pattern matching of many patterns against one text by dynamic programming.
+The text is compiled once (mismatch costs of each letter, lines of the matrix)
+and reused by every query, instead of building one PM_Matrix per pair.
+"""
+
+__author__ = "Garance Gourdel, Pierre Peterlongo"
+__email__ = "pierre.peterlongo@inria.fr, garance.gourdel@inria.fr"
+
+import sys
+
+from .pattern_matching import Constant
+
+
+class CompiledText:
+    """
+    Stores a text T, the cost of each of its letters against a letter of a pattern
+    and two lines of |T|+1 values, reused by every query.
+    """
+
+    def __init__(self, T):
+        self.T = T
+        consta = Constant()
+        self.match = consta.match
+        self.mismatch = consta.mismatch
+        self.gap = consta.gap
+        # cost of T[j] against a letter, computed once per letter
+        self.costs = {}
+        # first line of the matrix for pattern matching, and the two lines used while computing
+        self.first_row = [0 for j in range(len(T) + 1)]
+        self.previous_row = [0 for j in range(len(T) + 1)]
+        self.current_row = [0 for j in range(len(T) + 1)]
+
+    def __len__(self):
+        return len(self.T)
+
+    def get_costs(self, letter):
+        """Costs of each letter of T against letter
+
+        Returns:
+            list<int>: |T| costs, match or mismatch
+        """
+        costs = self.costs.get(letter)
+        if costs is None:
+            costs = [self.match if c == letter else self.mismatch for c in self.T]
+            self.costs[letter] = costs
+        return costs
+
+
+class CompiledPattern:
+    """Stores a pattern P as the list of its letters"""
+
+    def __init__(self, P):
+        self.P = P
+        self.letters = list(P)
+
+    def __len__(self):
+        return len(self.P)
+
+
+def fill_bounded(pattern, text, distance, max_value):
+    """Last line of the matrix, line by line, with Ukkonen's cut-off
+
+    A cell can only be lower than max_value if its top, top left or left
+    neighbour is: each line is only computed from the columns of the previous
+    line lower than max_value, rightwards while values stay lower than max_value.
+    Other cells are saturated (reported as max_value).
+
+    Returns:
+        list<int>: the last line (the previous_row of text)
+    """
+    gap = text.gap
+    n = len(text)
+    saturated_row = [max_value for j in range(n + 1)]
+    saturated_row[0] = sys.maxsize
+    previous = text.previous_row
+    current = text.current_row
+    previous[:] = text.first_row
+    active = range(n + 1)  # columns of the previous line lower than max_value
+    for letter in pattern.letters:
+        costs = text.get_costs(letter)
+        current[:] = saturated_row
+        new_active = []
+        last = 0  # last computed column of the line
+        for start in active:
+            # a cell of the previous line reaches its column and the next one
+            j = start if start > last else last + 1
+            if j == 0:
+                j = 1
+            left = current[j - 1]
+            while j <= n:
+                if distance == "dtw":
+                    value = previous[j - 1]
+                    if previous[j] < value:
+                        value = previous[j]
+                    if left < value:
+                        value = left
+                    value += costs[j - 1]
+                else:
+                    value = previous[j - 1] + costs[j - 1]
+                    if left + gap < value:
+                        value = left + gap
+                    if previous[j] + gap < value:
+                        value = previous[j] + gap
+                if value < max_value:
+                    current[j] = value
+                    new_active.append(j)
+                else:
+                    value = max_value
+                last = j
+                left = value
+                j += 1
+                if value >= max_value and j > start + 1:
+                    break
+        active = new_active
+        previous, current = current, previous
+    # the last computed line is in previous
+    text.previous_row, text.current_row = previous, current
+    return previous
+
+
+def search(pattern, text, distance="dtw", max_value=sys.maxsize):
+    """Best occurrence of a pattern in a text, with two lines of the matrix
+
+    Args:
+        pattern (str or CompiledPattern): pattern P
+        text (CompiledText): text T
+        distance (str): "dtw" (as PM_DTW) or "ed" (as PM_ED)
+        max_value (int): values larger than or equal to max_value are reported as
+            max_value, and only the cells which can be lower are computed (see fill_bounded)
+
+    Returns:
+        (int, int): as PM_Matrix.min_last_row_val_index: the minimal value of the
+            last line of the matrix and its first column (T[column - 1] ends the occurrence)
+    """
+    if distance not in ("dtw", "ed"):
+        raise ValueError(f"Unknown distance {distance}, expected dtw or ed")
+    if not isinstance(pattern, CompiledPattern):
+        pattern = CompiledPattern(pattern)
+    if max_value < sys.maxsize:
+        last_row = fill_bounded(pattern, text, distance, max_value)
+        m = min(last_row)
+        return m, last_row.index(m)
+    gap = text.gap
+    previous = text.previous_row
+    current = text.current_row
+    previous[:] = text.first_row
+    for letter in pattern.letters:
+        costs = text.get_costs(letter)
+        left = sys.maxsize
+        current[0] = left
+        if distance == "dtw":
+            for j, cost in enumerate(costs, 1):
+                value = previous[j - 1]
+                if previous[j] < value:
+                    value = previous[j]
+                if left < value:
+                    value = left
+                left = value + cost
+                current[j] = left
+        else:
+            for j, cost in enumerate(costs, 1):
+                value = previous[j - 1] + cost
+                if left + gap < value:
+                    value = left + gap
+                if previous[j] + gap < value:
+                    value = previous[j] + gap
+                current[j] = value
+                left = value
+        previous, current = current, previous
+    # the last computed line is in previous
+    text.previous_row, text.current_row = previous, current
+    m = min(previous)
+    return m, previous.index(m)
+
+
+def search_many(patterns, text, distance="dtw"):
+    """Best occurrence of each pattern in a text (see search)
+
+    Args:
+        patterns (iterable<str or CompiledPattern>): patterns
+        text (str or CompiledText): text, compiled once if it is a string
+        distance (str): "dtw" or "ed"
+
+    Yields:
+        (int, int): minimal value and its column, for each pattern in order
+    """
+    if not isinstance(text, CompiledText):
+        text = CompiledText(text)
+    for pattern in patterns:
+        yield search(pattern, text, distance)
+
+
+def main(P, T):
+    text = CompiledText(T)
+    for distance in ("dtw", "ed"):
+        value, column = search(P, text, distance)
+        print(f"{distance}: cost {value} for an occurrence ending at column {column}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        main(sys.argv[1], sys.argv[2])
+    else:
+        sys.stderr.write(f"Usage: python {sys.argv[0]} P T\n")
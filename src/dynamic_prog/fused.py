@@ -0,0 +1,103 @@
+"""
+Pattern matching of a pattern P in a text T under DTW and edit distance in a
+single traversal: both recurrences are filled line by line from the same costs,
+with the start position of the best path to each cell, so that no matrix is kept
+and no trace back is needed.
+"""
+
+__author__ = "Garance Gourdel, Pierre Peterlongo"
+__email__ = "pierre.peterlongo@inria.fr, garance.gourdel@inria.fr"
+
+import sys
+
+from .compiled import CompiledText
+
+
+def search_dtw_ed(P, text):
+    """Best occurrence of P in T, for DTW (as PM_DTW) and edit distance (as PM_ED)
+
+    The start position of a cell is the one of its predecessor on the path found
+    by PM_Matrix.trace_back: diagonal first, then left, then top.
+
+    Args:
+        P (str): pattern
+        text (str or CompiledText): text T, the costs of its letters are shared by both distances
+
+    Returns:
+        ((int, int, int), (int, int, int)): for DTW and for edit distance, the minimal
+            value of the last line, its first column (as PM_Matrix.min_last_row_val_index)
+            and the start position of the occurrence (as PM_Matrix.compute_origin_min_position)
+    """
+    if not isinstance(text, CompiledText):
+        text = CompiledText(text)
+    gap = text.gap
+    n = len(text)
+    # line 0: an occurrence may start anywhere
+    previous_dtw = [0 for j in range(n + 1)]
+    previous_ed = [0 for j in range(n + 1)]
+    previous_start_dtw = [j for j in range(n + 1)]
+    previous_start_ed = [j for j in range(n + 1)]
+    current_dtw = [0 for j in range(n + 1)]
+    current_ed = [0 for j in range(n + 1)]
+    current_start_dtw = [0 for j in range(n + 1)]
+    current_start_ed = [0 for j in range(n + 1)]
+    for letter in P:
+        costs = text.get_costs(letter)
+        # column 0 is infinite but on line 0
+        left_dtw = left_ed = sys.maxsize
+        current_dtw[0] = current_ed[0] = sys.maxsize
+        left_start_dtw = left_start_ed = 0
+        for j, cost in enumerate(costs, 1):
+            # DTW: min(diagonal, left, top) + cost
+            value = previous_dtw[j - 1]
+            start = previous_start_dtw[j - 1]
+            if left_dtw < value:
+                value = left_dtw
+                start = left_start_dtw
+            if previous_dtw[j] < value:
+                value = previous_dtw[j]
+                start = previous_start_dtw[j]
+            left_dtw = value + cost
+            left_start_dtw = start
+            current_dtw[j] = left_dtw
+            current_start_dtw[j] = start
+
+            # edit distance: min(diagonal + cost, left + gap, top + gap)
+            value = previous_ed[j - 1] + cost
+            start = previous_start_ed[j - 1]
+            if left_ed + gap < value:
+                value = left_ed + gap
+                start = left_start_ed
+            if previous_ed[j] + gap < value:
+                value = previous_ed[j] + gap
+                start = previous_start_ed[j]
+            left_ed = value
+            left_start_ed = start
+            current_ed[j] = value
+            current_start_ed[j] = start
+        previous_dtw, current_dtw = current_dtw, previous_dtw
+        previous_ed, current_ed = current_ed, previous_ed
+        previous_start_dtw, current_start_dtw = current_start_dtw, previous_start_dtw
+        previous_start_ed, current_start_ed = current_start_ed, previous_start_ed
+    # the last computed lines are the previous ones
+    results = []
+    for last_row, starts in (
+        (previous_dtw, previous_start_dtw),
+        (previous_ed, previous_start_ed),
+    ):
+        m = min(last_row)
+        column = last_row.index(m)
+        results.append((m, column, starts[column]))
+    return tuple(results)
+
+
+def main(P, T):
+    for distance, (value, column, start) in zip(("dtw", "ed"), search_dtw_ed(P, T)):
+        print(f"{distance}: cost {value} for an occurrence of T[{start}:{column}]")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        main(sys.argv[1], sys.argv[2])
+    else:
+        sys.stderr.write(f"Usage: python {sys.argv[0]} P T\n")
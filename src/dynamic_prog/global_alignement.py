@@ -40,11 +40,19 @@ class DynamicMatrix:
     defines some global alignment functions
     """
 
-    def __init__(self, S, T, match, mismatch, gap):
-        """ defines and stores initial values"""
+    engines = ("python", "numpy")
+
+    def __init__(self, S, T, match, mismatch, gap, engine="python"):
+        """defines and stores initial values
+
+        engine is "python" (pure Python fill) or "numpy" (vectorized fill, see numpy_fill)
+        """
+        if engine not in self.engines:
+            raise ValueError(f"Unknown engine {engine}, expected one of {self.engines}")
 
         self.S = S
         self.T = T
+        self.engine = engine
         self.gap = gap
         self.match = match
         self.mismatch = mismatch
@@ -95,6 +103,19 @@ class DynamicMatrix:
 
     def fill_NW(self):
         """ fills the matrix for global alignment (Needleman & Wunsch algo)"""
+        if self.engine == "numpy":
+            from .numpy_fill import fill_ed
+
+            self.matrix = fill_ed(
+                self.matrix[0],
+                [line[0] for line in self.matrix],
+                self.S,
+                self.T,
+                self.match,
+                self.mismatch,
+                self.gap,
+            )
+            return self.matrix[len(self.S)][len(self.T)]
         for i in range(1, len(self.S) + 1):
             # i-th line
             for j in range(1, len(self.T) + 1):
@@ -116,6 +137,18 @@ class DynamicMatrix:
 
     def fill_DTW(self):
         """ fills the matrix for global alignment (Needleman & Wunsch algo)"""
+        if self.engine == "numpy":
+            from .numpy_fill import fill_dtw
+
+            self.matrix = fill_dtw(
+                self.matrix[0],
+                [line[0] for line in self.matrix],
+                self.S,
+                self.T,
+                self.match,
+                self.mismatch,
+            )
+            return self.matrix[len(self.S)][len(self.T)]
         for i in range(1, len(self.S) + 1):
             # i-th line
             for j in range(1, len(self.T) + 1):
@@ -0,0 +1,123 @@
+"""
+NumPy kernels filling dynamic programming matrices line by line.
+The dependency of a cell on its left neighbour is resolved with a prefix minimum
+(np.minimum.accumulate), so that each line costs a constant number of vector operations.
+Matrices are returned as lists of lists of Python ints, identical to the ones of
+the pure Python fill methods.
+Requires NumPy (pip install BlockDTW[numpy]).
+"""
+
+__author__ = "Garance Gourdel, Pierre Peterlongo"
+__email__ = "pierre.peterlongo@inria.fr, garance.gourdel@inria.fr"
+
+import sys
+
+import numpy as np
+
+# Stands for sys.maxsize during the computation: adding a cost to it does not overflow int64
+INFINITY = 2 ** 62
+
+
+def letter_costs(S, T, match, mismatch):
+    """Cost of each letter of T against each distinct letter of S
+
+    Returns:
+        dict<str, np.ndarray>: for each letter of S, the |T| costs
+    """
+    T_letters = np.array(list(T))
+    costs = {}
+    for letter in S:
+        if letter not in costs:
+            costs[letter] = np.where(T_letters == letter, match, mismatch).astype(
+                np.int64
+            )
+    return costs
+
+
+def first_values(values):
+    return np.array([INFINITY if v >= INFINITY else v for v in values], dtype=np.int64)
+
+
+def to_lists(M, first_row, first_column):
+    """Matrix as lists of Python ints, with the original first line and first column"""
+    matrix = M.tolist()
+    matrix[0] = list(first_row)
+    for i, value in enumerate(first_column):
+        matrix[i][0] = value
+    return matrix
+
+
+def fill_dtw(first_row, first_column, S, T, match, mismatch):
+    """DTW matrix of S (vertical) and T (horizontal) from its first line and first column
+
+    For j >= 1, with c the costs of the line and S_j = c_1 + ... + c_j:
+    M[i][j] = c_j + min(M[i-1][j-1], M[i-1][j], M[i][j-1])
+            = S_j + min(M[i][0], min_{1 <= k <= j} (min(M[i-1][k-1], M[i-1][k]) - S_{k-1}))
+
+    Args:
+        first_row (list<int>): |T|+1 values of line 0
+        first_column (list<int>): |S|+1 values of column 0 (sys.maxsize for infinity)
+
+    Returns:
+        list<list<int>>: the (|S|+1) x (|T|+1) matrix
+    """
+    M = np.empty((len(S) + 1, len(T) + 1), dtype=np.int64)
+    M[0] = first_values(first_row)
+    M[:, 0] = first_values(first_column)
+    terms = np.empty(len(T) + 1, dtype=np.int64)
+    # prefix sums of the costs of each letter, from 0 to S_|T|
+    prefixes = {}
+    for letter, costs in letter_costs(S, T, match, mismatch).items():
+        prefixes[letter] = np.zeros(len(T) + 1, dtype=np.int64)
+        np.cumsum(costs, out=prefixes[letter][1:])
+    for i, letter in enumerate(S, 1):
+        prefix = prefixes[letter]
+        previous = M[i - 1]
+        terms[0] = M[i, 0]
+        np.minimum(previous[:-1], previous[1:], out=terms[1:])
+        np.subtract(terms[1:], prefix[:-1], out=terms[1:])
+        np.minimum.accumulate(terms, out=terms)
+        np.add(terms[1:], prefix[1:], out=M[i, 1:])
+    np.minimum(M, INFINITY, out=M)
+    return to_lists(M, first_row, first_column)
+
+
+def fill_ed(first_row, first_column, S, T, match, mismatch, gap):
+    """Edit distance matrix of S (vertical) and T (horizontal) from its first line and first column
+
+    For j >= 1, with c the costs of the line:
+    M[i][j] = min(M[i-1][j-1] + c_j, M[i-1][j] + gap, M[i][j-1] + gap)
+            = gap j + min(M[i][0], min_{1 <= k <= j} (min(M[i-1][k-1] + c_k, M[i-1][k] + gap) - gap k))
+
+    Args: see fill_dtw
+
+    Returns:
+        list<list<int>>: the (|S|+1) x (|T|+1) matrix
+    """
+    M = np.empty((len(S) + 1, len(T) + 1), dtype=np.int64)
+    M[0] = first_values(first_row)
+    M[:, 0] = first_values(first_column)
+    gaps = gap * np.arange(len(T) + 1, dtype=np.int64)
+    terms = np.empty(len(T) + 1, dtype=np.int64)
+    costs_of_letter = letter_costs(S, T, match, mismatch)
+    for i, letter in enumerate(S, 1):
+        costs = costs_of_letter[letter]
+        previous = M[i - 1]
+        terms[0] = M[i, 0]
+        np.minimum(previous[:-1] + costs, previous[1:] + gap, out=terms[1:])
+        terms[1:] -= gaps[1:]
+        np.minimum.accumulate(terms, out=terms)
+        M[i, 1:] = terms[1:] + gaps[1:]
+    np.minimum(M, INFINITY, out=M)
+    return to_lists(M, first_row, first_column)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        S, T = sys.argv[1], sys.argv[2]
+        first_row = [0] * (len(T) + 1)
+        first_column = [0] + [sys.maxsize] * len(S)
+        for line in fill_dtw(first_row, first_column, S, T, 0, 1):
+            print(line)
+    else:
+        sys.stderr.write(f"Usage: python {sys.argv[0]} S T\n")
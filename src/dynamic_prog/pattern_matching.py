@@ -6,6 +6,7 @@ __author__ = "Garance Gourdel, Pierre Peterlongo"
 __email__ = "pierre.peterlongo@inria.fr, garance.gourdel@inria.fr"
 
 from json.tool import main
+import heapq
 import sys
 
 
@@ -22,12 +23,46 @@ class PM_Matrix:
     defines some local alignment functions
     """
 
-    def __init__(self, P, T):
-        """ defines and stores initial values"""
+    engines = ("python", "numpy", "bitparallel")
+    modes = ("matrix", "last_row")
+    # modes computed by each engine
+    engine_modes = {
+        "python": modes,
+        "numpy": ("matrix",),
+        "bitparallel": ("last_row",),
+    }
+    # number of lines computed at once by the linear space trace back
+    band_height = 32
+
+    def __init__(self, P, T, engine="python", mode="matrix", max_value=sys.maxsize):
+        """defines and stores initial values
+
+        engine is "python" (pure Python fill), "numpy" (vectorized fill, see numpy_fill)
+        or "bitparallel" (bit vectors, see bit_parallel), for the last line only
+        mode is "matrix" (the whole matrix is kept) or "last_row": only two lines
+        are kept while filling, and the last line afterwards, in O(|T|) memory
+        (python and bitparallel engines)
+        max_value: values larger than or equal to max_value are reported as max_value.
+        The python engine (and the bitparallel one for DTW) only computes, in each
+        column, the cells down to the last one that can still lead to a value lower
+        than max_value (Ukkonen's cut-off), in O(max_value |T|) expected time
+        """
+        if engine not in self.engines:
+            raise ValueError(f"Unknown engine {engine}, expected one of {self.engines}")
+        if mode not in self.modes:
+            raise ValueError(f"Unknown mode {mode}, expected one of {self.modes}")
+        if mode not in self.engine_modes[engine]:
+            raise ValueError(
+                f"The {engine} engine computes the mode(s) {self.engine_modes[engine]}"
+            )
 
         consta = Constant()
         self.P = P
         self.T = T
+        self.engine = engine
+        self.mode = mode
+        self.max_value = max_value
+        self.last_row = None
         self.mismatch = consta.mismatch
         self.match = consta.match
         self.gap = consta.gap
@@ -37,15 +72,25 @@ class PM_Matrix:
         # P |
         #  |
 
-        self.matrix = [[] for i in range(len(P) + 1)]
-        for i in range(len(P) + 1):
-            self.matrix[i] = [0 for j in range(len(T) + 1)]
+        if self.mode == "last_row":
+            self.matrix = None
+        else:
+            if self.engine == "numpy":
+                # only the first line and the first column are read before filling
+                self.matrix = [[0 for j in range(len(T) + 1)]]
+                self.matrix += [[0] for i in range(len(P))]
+            else:
+                # cells which are not computed are saturated
+                initial_value = 0 if max_value == sys.maxsize else max_value
+                self.matrix = [[] for i in range(len(P) + 1)]
+                for i in range(len(P) + 1):
+                    self.matrix[i] = [initial_value for j in range(len(T) + 1)]
 
-        # initializes first line and first columns for pattern matching
-        for j in range(0, len(self.T) + 1):
-            self.matrix[0][j] = 0
-        for i in range(1, len(self.P) + 1):
-            self.matrix[i][0] = sys.maxsize
+            # initializes first line and first columns for pattern matching
+            for j in range(0, len(self.T) + 1):
+                self.matrix[0][j] = 0
+            for i in range(1, len(self.P) + 1):
+                self.matrix[i][0] = sys.maxsize
 
         # Determine block positions:
         # list of vertical frontiers:
@@ -81,6 +126,8 @@ class PM_Matrix:
             else:
                 return "\033[92m"
 
+        if self.matrix is None:
+            return f"last line: {self.last_row}\n"
         res = ""
         width = 4
         vide = " "
@@ -123,8 +170,14 @@ class PM_Matrix:
 
         return res + "\033[00m\n"
 
+    def get_last_row(self):
+        """Last line of the matrix: |T|+1 values, column j for an occurrence ending at T[j-1]"""
+        if self.matrix is None:
+            return self.last_row
+        return self.matrix[len(self.P)]
+
     def get_last_value(self):
-        return self.matrix[-1][-1]
+        return self.get_last_row()[-1]
 
     def dist(self, alpha, beta):
         if alpha == beta:
@@ -143,7 +196,168 @@ class PM_Matrix:
     def from_top(self, i, j):
         return False
 
+    def move_cost(self, i, j):
+        """Cost of reaching cell (i, j) from its left or top neighbour, None if impossible"""
+        return None
+
+    def first_row(self):
+        """First line of the matrix, for pattern matching"""
+        return [0 for j in range(len(self.T) + 1)]
+
+    def next_row(self, previous, i):
+        """Line i of the matrix from line i-1, on the columns of previous only
+
+        Args:
+            previous (list<int>): the first values of line i-1
+
+        Returns:
+            list<int>: the first len(previous) values of line i
+        """
+        row = [sys.maxsize]
+        letter = self.P[i - 1]
+        for j in range(1, len(previous)):
+            cost = self.dist(letter, self.T[j - 1])
+            value = previous[j - 1] + cost
+            move_cost = self.move_cost(i, j)
+            if move_cost is not None:
+                value = min(value, row[j - 1] + move_cost, previous[j] + move_cost)
+            row.append(value)
+        return row
+
+    def fill_bounded(self):
+        """Fills the matrix (or its last line) column by column, with Ukkonen's cut-off
+
+        Below the last cell lower than max_value of the previous column, the
+        computation of a column stops at the first saturated cell: all following
+        cells of the column are saturated as well. Columns are kept up to their
+        last computed cell.
+        """
+        max_value = self.max_value
+        m = len(self.P)
+        if self.matrix is None:
+            self.last_row = [sys.maxsize if m > 0 else 0]
+        column = [0]  # column 0 is infinite but on line 0
+        last_active = 0
+        for j in range(1, len(self.T) + 1):
+            letter = self.T[j - 1]
+            new_column = [0]
+            new_last_active = 0
+            for i in range(1, m + 1):
+                top = new_column[i - 1]
+                if i > last_active + 1 and top >= max_value:
+                    break
+                diag = column[i - 1] if i - 1 < len(column) else max_value
+                left = column[i] if i < len(column) else max_value
+                value = diag + self.dist(self.P[i - 1], letter)
+                move_cost = self.move_cost(i, j)
+                if move_cost is not None:
+                    value = min(value, left + move_cost, top + move_cost)
+                if value >= max_value:
+                    value = max_value
+                else:
+                    new_last_active = i
+                new_column.append(value)
+                if self.matrix is not None:
+                    self.matrix[i][j] = value
+            if self.matrix is None:
+                if len(new_column) > m:
+                    self.last_row.append(new_column[m])
+                else:
+                    self.last_row.append(max_value)
+            column = new_column
+            last_active = new_last_active
+        return self.get_last_value()
+
+    def saturate(self):
+        """Reports values larger than or equal to max_value as max_value (but column 0)"""
+        max_value = self.max_value
+        if max_value == sys.maxsize:
+            return
+        lines = [self.last_row] if self.matrix is None else self.matrix[1:]
+        for line in lines:
+            for j in range(1, len(line)):
+                if line[j] > max_value:
+                    line[j] = max_value
+
+    def fill_last_row(self):
+        """Fills the last line of the matrix, keeping only two lines at a time"""
+        row = self.first_row()
+        for i in range(1, len(self.P) + 1):
+            row = self.next_row(row, i)
+        self.last_row = row
+        return row[-1]
+
+    def __trace_band__(self, rows, first_line, j, alignment):
+        """Trace back from the last line of a band of consecutive lines to its first line
+
+        Args:
+            rows (list<list<int>>): lines first_line, first_line + 1... of the matrix
+            j (int): column of the path on the last line of the band
+            alignment (list<(str, str)>): aligned letters, completed from right to left
+
+        Returns:
+            int: column of the path on the first line of the band
+        """
+        i = first_line + len(rows) - 1
+        while i > first_line and j > 0:
+            x = i - first_line
+            value = rows[x][j]
+            cost = self.dist(self.P[i - 1], self.T[j - 1])
+            move_cost = self.move_cost(i, j)
+            # test first the diagonal, in order to favor diag in case of ex-aequos
+            if rows[x - 1][j - 1] + cost == value:
+                alignment.append((self.P[i - 1], self.T[j - 1]))
+                i -= 1
+                j -= 1
+            elif move_cost is not None and rows[x][j - 1] + move_cost == value:
+                alignment.append(("-", self.T[j - 1]))
+                j -= 1
+            elif move_cost is not None and rows[x - 1][j] + move_cost == value:
+                alignment.append((self.P[i - 1], "-"))
+                i -= 1
+            else:
+                raise ValueError(
+                    "This cell does not come from either the top, left or diagonal."
+                )
+        # here either i=first_line or j=0
+        assert i == first_line
+        return j
+
+    def __trace_lines__(self, first_line, last_line, top_row, j, alignment):
+        """Divide and conquer trace back from (last_line, j) to line first_line
+
+        Line first_line is given, the middle line is recomputed from it, the path is
+        traced back in the lower half to the middle line, then in the upper half.
+        Only O(log |P|) lines plus one band of band_height lines are kept at a time.
+
+        Args:
+            top_row (list<int>): line first_line, on columns 0..j
+            j (int): column of the path on line last_line
+
+        Returns:
+            int: column of the path on line first_line
+        """
+        if last_line - first_line <= self.band_height:
+            rows = [top_row]
+            for i in range(first_line + 1, last_line + 1):
+                rows.append(self.next_row(rows[-1], i))
+            return self.__trace_band__(rows, first_line, j, alignment)
+        middle_line = (first_line + last_line) // 2
+        row = top_row
+        for i in range(first_line + 1, middle_line + 1):
+            row = self.next_row(row, i)
+        j = self.__trace_lines__(middle_line, last_line, row, j, alignment)
+        return self.__trace_lines__(
+            first_line, middle_line, top_row[: j + 1], j, alignment
+        )
+
     def trace_back(self, pos):
+        if self.get_last_row()[pos] >= self.max_value:
+            raise ValueError(
+                f"No occurrence of distance lower than {self.max_value} ends at column {pos}"
+            )
+        if self.matrix is None:
+            return self.linear_trace_back(pos)
         assert pos < len(self.matrix[0])
         i = len(self.P)
         j = pos
@@ -178,18 +392,35 @@ class PM_Matrix:
         assert i == 0
         return j, alP, alT
 
+    def linear_trace_back(self, pos):
+        """Same as trace_back, in O(|T| log |P|) memory without the matrix
+
+        Lines are recomputed (divide and conquer, as in Hirschberg's algorithm)
+        in O(|P| pos log |P|) time, and the path is the one of trace_back.
+        """
+        assert pos < len(self.T) + 1
+        alignment = []
+        start = self.__trace_lines__(
+            0, len(self.P), self.first_row()[: pos + 1], pos, alignment
+        )
+        alignment.reverse()
+        alP = "".join(letter_P for letter_P, _ in alignment)
+        alT = "".join(letter_T for _, letter_T in alignment)
+        return start, alP, alT
+
     def min_last_row_val_index(self):
-        m = min(self.matrix[len(self.P)])
-        return m, self.matrix[len(self.P)].index(m)
+        last_row = self.get_last_row()
+        m = min(last_row)
+        return m, last_row.index(m)
 
     def index_min_last_row(self):
-        return self.matrix[len(self.P)].index(min(self.matrix[len(self.P)]))
+        last_row = self.get_last_row()
+        return last_row.index(min(last_row))
 
     def k_smallest(self, k):
-        return sorted(
-            range(len(self.matrix[len(self.P)])),
-            key=lambda sub: self.matrix[len(self.P)][sub],
-        )[:k]
+        last_row = self.get_last_row()
+        # same order as sorting the whole row, in O(|T| log k)
+        return heapq.nsmallest(k, range(len(last_row)), key=last_row.__getitem__)
 
     def compute_origin_min_position(self):
         return self.trace_back(self.index_min_last_row())
@@ -209,8 +440,33 @@ class PM_DTW(PM_Matrix):
             == self.matrix[i][j]
         )
 
+    def move_cost(self, i, j):
+        return self.dist(self.P[i - 1], self.T[j - 1])
+
     def fill(self):
         """ fills the matrix for global alignment (Needleman & Wunsch algo)"""
+        if self.engine == "bitparallel":
+            from .bit_parallel import dtw_last_row
+
+            self.last_row = dtw_last_row(self.P, self.T, self.max_value)
+            return self.last_row[-1]
+        if self.engine == "python" and self.max_value < sys.maxsize:
+            return self.fill_bounded()
+        if self.mode == "last_row":
+            return self.fill_last_row()
+        if self.engine == "numpy":
+            from .numpy_fill import fill_dtw
+
+            self.matrix = fill_dtw(
+                self.matrix[0],
+                [line[0] for line in self.matrix],
+                self.P,
+                self.T,
+                self.match,
+                self.mismatch,
+            )
+            self.saturate()
+            return self.matrix[len(self.P)][len(self.T)]
         for i in range(1, len(self.P) + 1):
             # i-th line
             for j in range(1, len(self.T) + 1):
@@ -234,8 +490,35 @@ class PM_ED(PM_Matrix):
     def from_top(self, i, j):
         return self.matrix[i - 1][j] + self.gap == self.matrix[i][j]
 
+    def move_cost(self, i, j):
+        return self.gap
+
     def fill(self):
         """ fills the matrix for global alignment (Needleman & Wunsch algo)"""
+        if self.engine == "bitparallel":
+            from .bit_parallel import ed_last_row
+
+            self.last_row = ed_last_row(self.P, self.T)
+            self.saturate()
+            return self.last_row[-1]
+        if self.engine == "python" and self.max_value < sys.maxsize:
+            return self.fill_bounded()
+        if self.mode == "last_row":
+            return self.fill_last_row()
+        if self.engine == "numpy":
+            from .numpy_fill import fill_ed
+
+            self.matrix = fill_ed(
+                self.matrix[0],
+                [line[0] for line in self.matrix],
+                self.P,
+                self.T,
+                self.match,
+                self.mismatch,
+                self.gap,
+            )
+            self.saturate()
+            return self.matrix[len(self.P)][len(self.T)]
         for i in range(1, len(self.P) + 1):
             # i-th line
             for j in range(1, len(self.T) + 1):
@@ -0,0 +1,178 @@
+"""
+Minimizer index of a homopolymer-compressed reference, selecting candidate windows
+of the reference for each read. Homopolymer errors of a read are invisible in its
+compressed string, so that the minimizers of a read are found in the reference as
+long as it has no other error around them. Distances are then only computed on the
+candidate windows, bounded by a max_value.
+"""
+
+__author__ = "Garance Gourdel, Pierre Peterlongo"
+__email__ = "pierre.peterlongo@inria.fr, garance.gourdel@inria.fr"
+
+from collections import deque
+import sys
+
+from BlockDTW.DTW_blocks import DtwByBlocks
+from BlockDTW.runs import RunLengthSequence
+from dynamic_prog.pattern_matching import PM_ED
+
+nucleotide_codes = {"A": 0, "C": 1, "G": 2, "T": 3}
+
+
+def kmer_hashes(S, k):
+    """Hash of each k-mer of S made of nucleotides only
+
+    A k-mer is encoded on 2k bits and mixed by a multiplication, so that
+    minimizers are not biased towards poly-A k-mers.
+
+    Yields:
+        (int, int): start position and hash of the k-mer
+    """
+    mask = (1 << (2 * k)) - 1
+    value = 0
+    length = 0
+    for i, letter in enumerate(S):
+        code = nucleotide_codes.get(letter)
+        if code is None:
+            length = 0
+            continue
+        value = ((value << 2) | code) & mask
+        length += 1
+        if length >= k:
+            yield i - k + 1, (value * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+
+
+def minimizers(S, k, w):
+    """Minimizers of S: the k-mer of smallest hash of each w consecutive k-mers
+
+    Returns:
+        list<(int, int)>: hash and start position of each minimizer, by increasing position
+    """
+    result = []
+    window = deque()  # (hash, position) of increasing hashes
+    last_position = None
+    for position, h in kmer_hashes(S, k):
+        while window and window[-1][0] >= h:
+            window.pop()
+        window.append((h, position))
+        while window[0][1] <= position - w:
+            window.popleft()
+        if window[0][1] != last_position:
+            last_position = window[0][1]
+            result.append(window[0])
+    return result
+
+
+class HPCIndex:
+    """
+    Stores a reference G, its homopolymer-compressed string and the positions
+    (in the compressed string) of each of its minimizers.
+    """
+
+    def __init__(self, G, k=15, w=10, margin=16, min_hits=2, max_occurrences=100):
+        """Builds the index
+
+        Args:
+            G (str): reference
+            k (int): size of the k-mers of the compressed strings (at most 32)
+            w (int): number of consecutive k-mers of a minimizer window
+            margin (int): number of runs added on both sides of a candidate window,
+                and maximal difference of diagonals of hits of a same window
+            min_hits (int): minimal number of minimizers of a read in a candidate window
+            max_occurrences (int): minimizers more frequent than this in G are ignored
+        """
+        self.G = G
+        self.k = k
+        self.w = w
+        self.margin = margin
+        self.min_hits = min_hits
+        self.max_occurrences = max_occurrences
+        self.runs = RunLengthSequence.from_string(G)
+        self.index = {}
+        for h, position in minimizers("".join(self.runs.letters), k, w):
+            self.index.setdefault(h, []).append(position)
+
+    def __run_start__(self, run):
+        return 0 if run == 0 else self.runs.ends[run - 1] + 1
+
+    def candidate_windows(self, R):
+        """Windows of G that may contain the best occurrence of a read
+
+        Each minimizer of the compressed read found in the compressed reference gives
+        a diagonal (position in the reference - position in the read). Close diagonals
+        are clustered, and a cluster of at least min_hits hits gives the window of the
+        compressed reference it covers, extended by margin runs on both sides.
+
+        Returns:
+            list<(int, int)>: start and end (excluded) positions in G of disjoint windows,
+                by increasing position
+        """
+        compressed_R = "".join(RunLengthSequence.from_string(R).letters) if R else ""
+        diagonals = []
+        for h, position in minimizers(compressed_R, self.k, self.w):
+            positions = self.index.get(h, ())
+            if len(positions) <= self.max_occurrences:
+                diagonals += [p - position for p in positions]
+        diagonals.sort()
+
+        windows = []
+        nb_runs = self.runs.get_nb_runs()
+        first = 0
+        for i in range(len(diagonals)):
+            if i + 1 < len(diagonals):
+                if diagonals[i + 1] - diagonals[i] <= self.margin:
+                    continue  # the cluster goes on
+            if i + 1 - first >= self.min_hits:
+                first_run = max(0, diagonals[first] - self.margin)
+                last_run = min(
+                    nb_runs - 1, diagonals[i] + len(compressed_R) - 1 + self.margin
+                )
+                start = self.__run_start__(first_run)
+                end = self.runs.ends[last_run] + 1
+                if windows and start <= windows[-1][1]:
+                    windows[-1] = (windows[-1][0], max(end, windows[-1][1]))
+                else:
+                    windows.append((start, end))
+            first = i + 1
+        return windows
+
+
+def evaluate_dtw_ed_windows(R, index, max_value=sys.maxsize, cascade=None):
+    """DTW and edit distances of the best occurrences of R in the candidate windows of an index
+
+    DTW is computed by DtwByBlocks and edit distance by PM_ED, both bounded by
+    max_value, then by the best distance found in the previous windows.
+    With a LowerBoundCascade, DTW is only computed on windows it does not prune.
+
+    Returns:
+        (int, int): DTW and edit distance, max_value if no occurrence of smaller
+            distance is found in the windows
+    """
+    score_dtw = max_value
+    score_ed = max_value
+    for start, end in index.candidate_windows(R):
+        window = index.G[start:end]
+        if cascade is None:
+            dtw = DtwByBlocks(R, window, score_dtw, mode="last_row")
+            score_dtw = min(score_dtw, dtw.best_occurrence()[0])
+        else:
+            score_dtw = min(score_dtw, cascade.distance(R, window, score_dtw))
+        led = PM_ED(R, window, mode="last_row", max_value=score_ed)
+        score_ed = min(score_ed, led.min_last_row_val_index()[0])
+    return score_dtw, score_ed
+
+
+def main(genome_file, R):
+    from experiments.read_generator import load_genome
+
+    index = HPCIndex(load_genome(genome_file))
+    print(f"candidate windows: {index.candidate_windows(R)}")
+    score_dtw, score_ed = evaluate_dtw_ed_windows(R, index, len(R) + 1)
+    print(f"DTW {score_dtw}, ED {score_ed}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        main(sys.argv[1], sys.argv[2])
+    else:
+        sys.stderr.write(f"Usage: python {sys.argv[0]} genome.fa read\n")
@@ -1,5 +1,11 @@
 from dynamic_prog.pattern_matching import PM_ED, PM_DTW
-from sys import argv
+from dynamic_prog.compiled import CompiledText
+from dynamic_prog.fused import search_dtw_ed
+from BlockDTW.DTW_blocks import DtwByBlocks
+from BlockDTW.ED_blocks import BlockED
+from experiments.hpc_index import HPCIndex, evaluate_dtw_ed_windows
+from BlockDTW.lower_bounds import LowerBoundCascade
+from sys import argv, maxsize
 import argparse
 from random import randint, random, choice, choices
 import csv
@@ -20,10 +26,44 @@ class Error_rate:
         return f"I:{round(self.inser,2)},D:{round(self.dele,2)},S:{round(self.sub,2)}"
 
 
-def evaluate_dtw_ed(R, G, pos, qual, biological_var, bio_qual):
-    """ Aligns the sequence R to G w.r. to ED and DTW """
-    ldtw = PM_DTW(R, G)
-    led = PM_ED(R, G)
+engines = ("fused", "blocks") + PM_DTW.engines
+
+
+def evaluate_dtw_ed(
+    R,
+    G,
+    pos,
+    qual,
+    biological_var,
+    bio_qual,
+    engine="python",
+    index=None,
+    max_value=maxsize,
+    cascade=None,
+):
+    """ Aligns the sequence R to G w.r. to ED and DTW
+
+    engine is "fused" (both distances in a single traversal, see dynamic_prog.fused),
+    "blocks" (DtwByBlocks and BlockED, computed by runs, distances only: neither the
+    end nor the start position of the occurrences) or an engine of PM_DTW and PM_ED
+    G may be a dynamic_prog.compiled.CompiledText for the fused engine
+    With an HPCIndex of G, distances are only computed on the candidate windows of R
+    (see hpc_index.evaluate_dtw_ed_windows), distances >= max_value are reported as max_value,
+    and DTW is only computed on the windows that a LowerBoundCascade does not prune
+    """
+    if index is not None:
+        return evaluate_dtw_ed_windows(R, index, max_value, cascade)
+    if engine == "fused":
+        (score_dtw, _, _), (score_ed, _, _) = search_dtw_ed(R, G)
+        return score_dtw, score_ed
+    if engine == "blocks":
+        score_dtw, _ = DtwByBlocks(R, G, mode="last_row").best_occurrence()
+        score_ed, _ = BlockED(R, G, mode="last_row").best_occurrence()
+        return score_dtw, score_ed
+    # the bitparallel engine only computes the last line
+    mode = "last_row" if engine == "bitparallel" else "matrix"
+    ldtw = PM_DTW(R, G, engine, mode)
+    led = PM_ED(R, G, engine, mode)
     score_dtw, pos_dtw = ldtw.min_last_row_val_index()
     start_dtw, al_P, al_T = ldtw.compute_origin_min_position()
 
@@ -141,8 +181,21 @@ def theoretical_distance(r, l, qual, dele_prec):
     return nb_mismatch
 
 
-def generate_read(Go, Gi, qual_Gi, N, read_length, err):
+def generate_read(
+    Go,
+    Gi,
+    qual_Gi,
+    N,
+    read_length,
+    err,
+    engine="python",
+    index=None,
+    max_value=maxsize,
+    cascade=None,
+):
     dele_prec = deletion_before(qual_Gi)
+    # the reference is compiled once for all reads
+    G = CompiledText(Go) if engine == "fused" and index is None else Go
     genome_name = argv[1].split("/")[-1].split(".")[0]
     output_file_name = f"results/{genome_name}_N_{N}_ID_{err.indel}_SNP_{err.snp}_H_{err.homopoly}_seqS_{err.seq_S}_max_len_indel_{err.max_len_ID}"
     read_file = open(output_file_name + ".fastq", "w")
@@ -187,7 +240,16 @@ def generate_read(Go, Gi, qual_Gi, N, read_length, err):
         print(id)
         # print(r, dele_prec[r])
         score_dtw, score_ed = evaluate_dtw_ed(
-            read, Go, r, qual, biological_var, bio_qual
+            read,
+            G,
+            r,
+            qual,
+            biological_var,
+            bio_qual,
+            engine,
+            index,
+            max_value,
+            cascade,
         )
         csv_output.writerow(
             [id, biological_var, nb_s, nb_homopoly, score_dtw, score_ed]
@@ -215,10 +277,38 @@ def parse_args():
         type=float,
         default=(1 / 3, 1 / 3, 1 / 3),
     )
+    parser.add_argument(
+        "--engine",
+        help="Engine computing the distances: fused, blocks (distances only: no end or start position of the occurrences is computed, BlockED has no alignment), or an engine filling the dynamic programming matrices (numpy requires NumPy)",
+        choices=engines,
+        default="python",
+    )
+    parser.add_argument(
+        "--index",
+        help="Only align reads on the candidate windows of a homopolymer-compressed minimizer index of the genome, pruned by lower bounds of DTW",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--max_value",
+        help="With --index, distances larger than or equal to max_value are reported as max_value (default: read length + 1, exact)",
+        type=int,
+        default=None,
+    )
 
     args = parser.parse_args()
+    max_value = args.max_value
+    if max_value is None:
+        max_value = args.read_length + 1
 
-    return args.genome_file, args.N, args.read_length, args.IDS
+    return (
+        args.genome_file,
+        args.N,
+        args.read_length,
+        args.IDS,
+        args.engine,
+        args.index,
+        max_value,
+    )
 
 
 def load_genome(genome_file):
@@ -230,8 +320,19 @@ def load_genome(genome_file):
 
 def main():
     err_homopoly_list = [round(0.05 + 0.05 * i, 2) for i in range(6)]
-    genome_file, N, read_length, ids = parse_args()
+    genome_file, N, read_length, ids, engine, use_index, max_value = parse_args()
     Go = load_genome(genome_file)
+    index = None
+    cascade = None
+    if use_index:
+        index = HPCIndex(Go)
+        # lower bounds in front of PM_DTW for its engines, of DtwByBlocks otherwise
+        cascade_engine = "blocks"
+        if engine == "bitparallel":
+            cascade_engine = "bitparallel"
+        elif engine in PM_DTW.engines:
+            cascade_engine = "dtw"
+        cascade = LowerBoundCascade(engine=cascade_engine)
     err = Error_rate(0)
     Gi, qual_Gi, nb_IDS_Gi = add_IDS_err(Go, err)
     print(Go[:200])
@@ -240,7 +341,11 @@ def main():
     print(f"biological distance overall: {nb_IDS_Gi}/{len(Gi)}")
     for err_hom in err_homopoly_list:
         err = Error_rate(err_hom)
-        generate_read(Go, Gi, qual_Gi, N, read_length, err)
+        generate_read(
+            Go, Gi, qual_Gi, N, read_length, err, engine, index, max_value, cascade
+        )
+    if cascade is not None:
+        print(f"Lower bounds of DTW before the exact computation: {cascade.report()}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,80 @@
+from dynamic_prog.pattern_matching import PM_DTW, PM_ED
+from dynamic_prog import compiled as dp_compiled
+from BlockDTW import compiled as block_compiled
+from BlockDTW.runs import RunLengthSequence
+from timer import Timer
+from validation import get_random_string
+
+import random
+import sys
+
+
+def get_read(T, read_length, homopol_extension):
+    """Substring of T of length read_length, each letter extended with some probability"""
+    start = random.randint(0, len(T) - read_length)
+    read = ""
+    for c in T[start : start + read_length]:
+        read += c
+        while random.random() < homopol_extension:
+            read += c
+    return read
+
+
+def main(nb_reads, text_length, read_length, bound_homopol):
+    T = get_random_string(text_length, bound_homopol)
+    reads = [get_read(T, read_length, 0.1) for _ in range(nb_reads)]
+
+    # one PM_DTW and one PM_ED per read, as in read_generator.evaluate_dtw_ed
+    pair_res = []
+    with Timer() as pair_time:
+        for read in reads:
+            ldtw = PM_DTW(read, T)
+            led = PM_ED(read, T)
+            pair_res.append(
+                (ldtw.min_last_row_val_index(), led.min_last_row_val_index())
+            )
+    pair_time.print("One matrix per pair: {} seconds")
+
+    compiled_res = []
+    with Timer() as compiled_time:
+        text = dp_compiled.CompiledText(T)
+        patterns = [dp_compiled.CompiledPattern(read) for read in reads]
+        compiled_res = list(
+            zip(
+                dp_compiled.search_many(patterns, text, "dtw"),
+                dp_compiled.search_many(patterns, text, "ed"),
+            )
+        )
+    compiled_time.print("Compiled text (dynamic programming): {} seconds")
+
+    with Timer() as block_time:
+        text = RunLengthSequence.from_string(T)
+        block_res = list(block_compiled.search_many(reads, text))
+    block_time.print("Compiled text (blocks, DTW only): {} seconds")
+
+    for i in range(nb_reads):
+        assert pair_res[i] == compiled_res[i], f"Test failed with {reads[i]}"
+        # blocks report 0-based end positions, matrices report columns
+        value, column = pair_res[i][0]
+        assert block_res[i] == (value, column - 1), f"Test failed with {reads[i]}"
+
+    for name, timer in (
+        ("one matrix per pair", pair_time),
+        ("compiled (dynamic programming)", compiled_time),
+        ("compiled (blocks)", block_time),
+    ):
+        print(f"Amortized cost per read, {name}: {timer.value() / nb_reads} seconds")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 5:
+        sys.stderr.write(
+            f"Usage: python {sys.argv[0]} nb_reads text_length read_length homopol_size_bound\n"
+        )
+    else:
+        main(
+            nb_reads=int(sys.argv[1]),
+            text_length=int(sys.argv[2]),
+            read_length=int(sys.argv[3]),
+            bound_homopol=int(sys.argv[4]),
+        )
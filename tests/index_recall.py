@@ -0,0 +1,80 @@
+from experiments.hpc_index import HPCIndex, evaluate_dtw_ed_windows
+from BlockDTW.lower_bounds import LowerBoundCascade
+from experiments.read_generator import (
+    Error_rate,
+    add_IDS_err,
+    add_seq_err,
+    evaluate_dtw_ed,
+    load_genome,
+)
+from dynamic_prog.compiled import CompiledText
+from timer import Timer
+
+import random
+import sys
+
+
+def get_genome(genome):
+    """Genome of a fasta file, or random genome of the given length"""
+    if genome.isdigit():
+        return "".join(random.choice("ACGT") for _ in range(int(genome)))
+    return load_genome(genome)
+
+
+def main(genome, nb_reads, read_length, homopoly, exhaustive=True):
+    Go = get_genome(genome)
+    Gi, _, _ = add_IDS_err(Go, Error_rate(0))
+    err = Error_rate(homopoly)
+    reads = []
+    for _ in range(nb_reads):
+        r = random.randint(0, len(Gi) - read_length - 1)
+        read, _, _, _ = add_seq_err(Gi[r : r + read_length], err)
+        reads.append(read)
+    # distances are exact below max_value (which is never reached by an edit distance)
+    max_value = read_length + 1
+
+    with Timer() as index_time:
+        index = HPCIndex(Go)
+    index_time.print("Index construction: {} seconds")
+
+    cascade = LowerBoundCascade()
+    with Timer() as window_time:
+        window_res = [
+            evaluate_dtw_ed_windows(read, index, max_value, cascade) for read in reads
+        ]
+    window_time.print("Candidate windows: {} seconds")
+    print(f"Lower bounds of DTW before the exact computation: {cascade.report()}")
+    print(f"Per read: {window_time.value() / nb_reads} seconds")
+    if not exhaustive:
+        return
+
+    with Timer() as exhaustive_time:
+        text = CompiledText(Go)
+        exhaustive_res = [
+            evaluate_dtw_ed(read, text, 0, "", "", "", "fused") for read in reads
+        ]
+    exhaustive_time.print("Whole genome: {} seconds")
+    print(f"Per read: {exhaustive_time.value() / nb_reads} seconds")
+
+    # a window is a substring of the genome: its distances are never lower
+    for i in range(nb_reads):
+        for window_value, value in zip(window_res[i], exhaustive_res[i]):
+            assert window_value >= value, f"Test failed with {reads[i]}"
+    for name, d in (("DTW", 0), ("ED", 1)):
+        found = sum(window_res[i][d] == exhaustive_res[i][d] for i in range(nb_reads))
+        print(f"Recall {name}: {found}/{nb_reads} = {found / nb_reads}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (5, 6):
+        sys.stderr.write(
+            f"Usage: python {sys.argv[0]} genome.fa|genome_length nb_reads read_length homopoly_proba <index_only>\n"
+        )
+    else:
+        main(
+            genome=sys.argv[1],
+            nb_reads=int(sys.argv[2]),
+            read_length=int(sys.argv[3]),
+            homopoly=float(sys.argv[4]),
+            exhaustive=len(sys.argv) == 5,
+        )
@@ -1,9 +1,25 @@
-from dynamic_prog.pattern_matching import PM_DTW
+from dynamic_prog.pattern_matching import PM_DTW, PM_ED
+from dynamic_prog.global_alignement import DynamicMatrix
+from dynamic_prog import compiled as dp_compiled
+from dynamic_prog.fused import search_dtw_ed
 from BlockDTW.DTW_blocks import *
+from BlockDTW.ED_blocks import BlockED
+from BlockDTW.flat_blocks import FlatDtwByBlocks
+from BlockDTW.streaming import iter_stream_occurrences
+from BlockDTW.multi_search import top_k_hits
+from BlockDTW.wavefront import WavefrontDtwByBlocks, executors
+from BlockDTW import batch
+from BlockDTW import compiled as block_compiled
+from BlockDTW.lower_bounds import LowerBoundCascade, default_stages, exact_engines
+from experiments.hpc_index import HPCIndex
+from experiments.read_generator import Error_rate, add_seq_err, evaluate_dtw_ed
+from BlockDTW.block import Block
+from BlockDTW.runs import RunLengthSequence
 from timer import Timer
 from progress_bar import update_progress
 
 import random
+from array import array
 
 
 def get_random_string(minsize, bound_homopol):
@@ -18,6 +34,32 @@ def get_random_string(minsize, bound_homopol):
     return random_string
 
 
+def random_block_input(height, width):
+    """Random block input, as in BlockDTW.block.random_tests"""
+    Vnw = random.randint(0, 10)
+    Vw = random.randint(0, Vnw + 1)
+    Vn = random.randint(0, Vnw + 1)
+    h_cuts = [x for x in range(width - 1) if random.getrandbits(1)]
+    v_cuts = [y for y in range(height - 1) if random.getrandbits(1)]
+    return Vnw, Vw, Vn, h_cuts, v_cuts
+
+
+def block_benchmark(nb_tests):
+    """Times the computation of square blocks of increasing sizes
+
+    The time per block divided by (height + width) should be roughly constant.
+    """
+    for size in range(50, 501, 50):
+        inputs = [random_block_input(size, size) for _ in range(nb_tests)]
+        with Timer() as block_time:
+            for Vnw, Vw, Vn, h_cuts, v_cuts in inputs:
+                Block(size, size, False, Vnw, Vw, Vn, h_cuts, v_cuts)
+        per_block = block_time.value() / nb_tests
+        print(
+            f"{size}x{size} blocks: {per_block} seconds per block, {per_block / (2 * size)} seconds per (height + width)"
+        )
+
+
 def main(nb_tests, size_min, bound_homopol):
     # nb_tests = 10
     # size_min = 1000
@@ -59,21 +101,672 @@ def main(nb_tests, size_min, bound_homopol):
     timeb = block_time.value()
     print(f"Durée per block = {round(timeb,2)}/{nb_blocks} = {timeb/nb_blocks} seconds")
 
+    flat_block_res = []
+    with Timer() as flat_time:
+        for i in range(nb_tests):
+            update_progress(i / float(nb_tests))
+            P = PT_strings[i][0]
+            T = PT_strings[i][1]
+            dtw = FlatDtwByBlocks(P, T)
+            flat_block_res.append(dtw.get_br_value())
+        update_progress(1)
+    flat_time.print("Durée with flat blocks = {} seconds")
+    timef = flat_time.value()
+    print(f"Durée per block = {round(timef,2)}/{nb_blocks} = {timef/nb_blocks} seconds")
+
+    interval_block_res = []
+    with Timer() as interval_time:
+        for i in range(nb_tests):
+            update_progress(i / float(nb_tests))
+            P = PT_strings[i][0]
+            T = PT_strings[i][1]
+            dtw = DtwByBlocks(P, T, cut_intervals=True)
+            interval_block_res.append(dtw.get_br_value())
+        update_progress(1)
+    interval_time.print("Durée with interval blocks = {} seconds")
+
     # Validations
     for i in range(nb_tests):
         assert (
             classic_res[i] == dtw_block_res[i]
         ), f"Test failed with {PT_strings[i][0]} {PT_strings[i][1]}: {classic_res[i]} vs {dtw_block_res[i]}"
+        assert (
+            classic_res[i] == flat_block_res[i]
+        ), f"Flat test failed with {PT_strings[i][0]} {PT_strings[i][1]}: {classic_res[i]} vs {flat_block_res[i]}"
+        assert (
+            classic_res[i] == interval_block_res[i]
+        ), f"Interval test failed with {PT_strings[i][0]} {PT_strings[i][1]}: {classic_res[i]} vs {interval_block_res[i]}"
 
     print(f"We performed {nb_tests} tests, all passed !")
 
 
+def global_validation(nb_tests, size_min, bound_homopol):
+    """Compares global and semi global DtwByBlocks with DynamicMatrix.fill_DTW"""
+    PT_strings = [
+        [
+            get_random_string(size_min, bound_homopol),
+            get_random_string(size_min, bound_homopol),
+        ]
+        for _ in range(nb_tests)
+    ]
+
+    classic_res = []
+    with Timer() as classical_time:
+        for i in range(nb_tests):
+            update_progress(i / float(nb_tests))
+            P, T = PT_strings[i]
+            global_dtw = DynamicMatrix(P, T, 0, 1, 1)
+            global_dtw.initGlobal_DTW()
+            global_value = global_dtw.fill_DTW()
+            # without init, the first line and the first column are zeros
+            semi_global_dtw = DynamicMatrix(P, T, 0, 1, 1)
+            semi_global_dtw.fill_DTW()
+            semi_global_value = min(
+                semi_global_dtw.matrix[-1][1:]
+                + [line[-1] for line in semi_global_dtw.matrix[1:]]
+            )
+            classic_res.append((global_value, semi_global_value))
+        update_progress(1)
+    classical_time.print("Durée classique = {} seconds")
+
+    block_res = []
+    with Timer() as block_time:
+        for i in range(nb_tests):
+            update_progress(i / float(nb_tests))
+            P, T = PT_strings[i]
+            global_dtw = DtwByBlocks(P, T, mode="distance", boundary="global")
+            semi_global_dtw = DtwByBlocks(P, T, mode="last_row", boundary="semi_global")
+            block_res.append(
+                (global_dtw.get_br_value(), semi_global_dtw.best_ends_free_value())
+            )
+        update_progress(1)
+    block_time.print("Durée with blocks = {} seconds")
+
+    for i in range(nb_tests):
+        assert (
+            classic_res[i] == block_res[i]
+        ), f"Test failed with {PT_strings[i][0]} {PT_strings[i][1]}: {classic_res[i]} vs {block_res[i]}"
+
+    print(f"We performed {nb_tests} global and semi global tests, all passed !")
+
+
+def ed_validation(nb_tests, size_min, bound_homopol):
+    """Compares the last row of BlockED with the one of PM_ED"""
+    PT_strings = [
+        [
+            get_random_string(size_min, bound_homopol),
+            get_random_string(size_min, bound_homopol),
+        ]
+        for _ in range(nb_tests)
+    ]
+
+    classic_res = []
+    with Timer() as classical_time:
+        for i in range(nb_tests):
+            update_progress(i / float(nb_tests))
+            P, T = PT_strings[i]
+            led = PM_ED(P, T)
+            led.fill()
+            classic_res.append(led.get_last_row()[1:])
+        update_progress(1)
+    classical_time.print("Durée classique = {} seconds")
+
+    block_res = []
+    with Timer() as block_time:
+        for i in range(nb_tests):
+            update_progress(i / float(nb_tests))
+            P, T = PT_strings[i]
+            block_res.append(BlockED(P, T, mode="last_row").get_last_row())
+        update_progress(1)
+    block_time.print("Durée with blocks = {} seconds")
+
+    for i in range(nb_tests):
+        assert (
+            classic_res[i] == block_res[i]
+        ), f"Test failed with {PT_strings[i][0]} {PT_strings[i][1]}"
+
+    print(f"We performed {nb_tests} edit distance tests, all passed !")
+
+
+def random_chunks(T):
+    """T cut into chunks at random positions (runs may straddle chunks)"""
+    cuts = sorted(random.sample(range(len(T) + 1), random.randint(0, min(len(T), 10))))
+    return [T[start:end] for start, end in zip([0] + cuts, cuts + [len(T)])]
+
+
+def streaming_validation(nb_tests, size_min, bound_homopol):
+    """Compares the occurrences of StreamingDtwByBlocks, fed by random chunks,
+    with DtwByBlocks.iter_occurrences"""
+    for i in range(nb_tests):
+        update_progress(i / float(nb_tests))
+        P = get_random_string(random.randint(1, size_min), bound_homopol)
+        T = get_random_string(size_min, bound_homopol)
+        for max_value in (1, len(P) // 4 + 1, sys.maxsize):
+            expected = list(
+                DtwByBlocks(P, T, max_value, mode="last_row").iter_occurrences()
+            )
+            for cut_intervals in (False, True):
+                chunks = random_chunks(T)
+                occurrences = list(
+                    iter_stream_occurrences(P, chunks, max_value, cut_intervals)
+                )
+                assert (
+                    occurrences == expected
+                ), f"Test failed with {P} {T} max_value {max_value}"
+    update_progress(1)
+    print(f"We performed {nb_tests} streaming tests, all passed !")
+
+
+def saturated(row, max_value):
+    """Line of an unbounded fill, values >= max_value reported as max_value (but column 0)"""
+    return row[:1] + [min(value, max_value) for value in row[1:]]
+
+
+def test_max_values(P):
+    """max_value of the bounded computations of a pattern"""
+    return (1, 2, len(P) // 4 + 1, len(P) // 2 + 1, sys.maxsize)
+
+
+def bitparallel_validation(nb_tests, size_min, bound_homopol):
+    """Compares the last rows of the bitparallel engines of PM_DTW and PM_ED with the
+    ones of the python engine, for several max_value, on strings without and with
+    homopolymers, with patterns longer than a machine word (64 letters)"""
+    for i in range(nb_tests):
+        update_progress(i / float(nb_tests))
+        for homopol in (1, bound_homopol):
+            T = get_random_string(size_min, homopol)
+            for P in (
+                get_random_string(random.randint(1, size_min), homopol),
+                get_random_string(size_min + 64, homopol),
+            ):
+                for PM in (PM_DTW, PM_ED):
+                    row = PM(P, T, mode="last_row").get_last_row()
+                    for max_value in test_max_values(P):
+                        bitparallel_row = PM(
+                            P, T, "bitparallel", "last_row", max_value
+                        ).get_last_row()
+                        assert bitparallel_row == saturated(
+                            row, max_value
+                        ), f"{PM.__name__} test failed with {P} {T} max_value {max_value}"
+    update_progress(1)
+    print(f"We performed {nb_tests} bitparallel tests, all passed !")
+
+
+def bounded_validation(nb_tests, size_min, bound_homopol):
+    """Compares the python fill bounded by max_value (Ukkonen's cut-off) with the
+    saturated unbounded fill, in matrix and last_row modes, and the last line of
+    the bounded search of a compiled text"""
+    for i in range(nb_tests):
+        update_progress(i / float(nb_tests))
+        for homopol in (1, bound_homopol):
+            P = get_random_string(random.randint(1, size_min), homopol)
+            T = get_random_string(size_min, homopol)
+            text = dp_compiled.CompiledText(T)
+            pattern = dp_compiled.CompiledPattern(P)
+            for PM, distance in ((PM_DTW, "dtw"), (PM_ED, "ed")):
+                matrix = PM(P, T).matrix
+                for max_value in test_max_values(P):
+                    expected = matrix[:1]
+                    expected += [saturated(line, max_value) for line in matrix[1:]]
+                    bounded = PM(P, T, max_value=max_value)
+                    assert (
+                        bounded.matrix == expected
+                    ), f"{PM.__name__} matrix test failed with {P} {T} max_value {max_value}"
+                    bounded = PM(P, T, mode="last_row", max_value=max_value)
+                    assert (
+                        bounded.get_last_row() == expected[-1]
+                    ), f"{PM.__name__} last row test failed with {P} {T} max_value {max_value}"
+                    last_row = dp_compiled.fill_bounded(pattern, text, distance, max_value)
+                    assert (
+                        last_row == expected[-1]
+                    ), f"compiled {distance} test failed with {P} {T} max_value {max_value}"
+    update_progress(1)
+    print(f"We performed {nb_tests} bounded fill tests, all passed !")
+
+
+def numpy_validation(nb_tests, size_min, bound_homopol):
+    """Compares the matrices filled by the numpy engine with the ones of the python engine:
+    PM_DTW and PM_ED (for several max_value), DynamicMatrix.fill_DTW and fill_NW
+    with and without initGlobal_DTW and initGlobal_NW, for two score systems"""
+    for i in range(nb_tests):
+        update_progress(i / float(nb_tests))
+        for homopol in (1, bound_homopol):
+            P = get_random_string(random.randint(1, size_min), homopol)
+            T = get_random_string(size_min, homopol)
+            for PM in (PM_DTW, PM_ED):
+                for max_value in test_max_values(P):
+                    python_matrix = PM(P, T, max_value=max_value).matrix
+                    numpy_matrix = PM(P, T, "numpy", max_value=max_value).matrix
+                    assert (
+                        numpy_matrix == python_matrix
+                    ), f"{PM.__name__} test failed with {P} {T} max_value {max_value}"
+            for match, mismatch, gap in ((0, 1, 1), (1, 3, 2)):
+                for fill, init in (
+                    (DynamicMatrix.fill_DTW, DynamicMatrix.initGlobal_DTW),
+                    (DynamicMatrix.fill_NW, DynamicMatrix.initGlobal_NW),
+                ):
+                    for global_init in (False, True):
+                        matrices = []
+                        for engine in ("python", "numpy"):
+                            dm = DynamicMatrix(P, T, match, mismatch, gap, engine)
+                            if global_init:
+                                init(dm)
+                            fill(dm)
+                            matrices.append(dm.matrix)
+                        assert (
+                            matrices[0] == matrices[1]
+                        ), f"DynamicMatrix.{fill.__name__} test failed with {P} {T}"
+    update_progress(1)
+    print(f"We performed {nb_tests} numpy tests, all passed !")
+
+
+def traceback_validation(nb_tests, size_min, bound_homopol):
+    """Compares the trace back of PM_DTW and PM_ED in last_row mode (divide and
+    conquer on the lines) with the one of matrix mode, at every end position,
+    with patterns longer than PM_Matrix.band_height"""
+    for i in range(nb_tests):
+        update_progress(i / float(nb_tests))
+        T = get_random_string(size_min, bound_homopol)
+        for P in (
+            get_random_string(random.randint(1, size_min), bound_homopol),
+            get_random_string(3 * PM_DTW.band_height + size_min, bound_homopol),
+        ):
+            for PM in (PM_DTW, PM_ED):
+                for max_value in (len(P) // 2 + 1, sys.maxsize):
+                    matrix = PM(P, T, max_value=max_value)
+                    linear = PM(P, T, mode="last_row", max_value=max_value)
+                    last_row = linear.get_last_row()
+                    for pos in range(1, len(T) + 1):
+                        if last_row[pos] >= max_value:
+                            continue
+                        assert linear.trace_back(pos) == matrix.trace_back(
+                            pos
+                        ), f"{PM.__name__} test failed with {P} {T} at {pos}"
+    update_progress(1)
+    print(f"We performed {nb_tests} trace back tests, all passed !")
+
+
+def pm_warping_path(ldtw, pos):
+    """Cells (position in P, position in T) visited by PM_DTW.trace_back(pos)"""
+    i = len(ldtw.P)
+    j = pos
+    path = []
+    while i > 0 and j > 0:
+        path.append((i - 1, j - 1))
+        if ldtw.from_diag(i, j):
+            i -= 1
+            j -= 1
+        elif ldtw.from_left(i, j):
+            j -= 1
+        else:
+            i -= 1
+    path.reverse()
+    return path
+
+
+def alignment_validation(nb_tests, size_min, bound_homopol):
+    """Compares the trace back and the warping path of DtwByBlocks with the ones
+    of PM_DTW at every end position of distance lower than max_value"""
+    for i in range(nb_tests):
+        update_progress(i / float(nb_tests))
+        P = get_random_string(random.randint(1, size_min), bound_homopol)
+        T = get_random_string(size_min, bound_homopol)
+        ldtw = PM_DTW(P, T)
+        last_row = ldtw.get_last_row()
+        for max_value in (1, len(P) // 4 + 1, sys.maxsize):
+            for cut_intervals in (False, True):
+                dtw = DtwByBlocks(P, T, max_value, cut_intervals)
+                for end in range(len(T)):
+                    if last_row[end + 1] >= max_value:
+                        continue
+                    assert dtw.trace_back(end) == ldtw.trace_back(
+                        end + 1
+                    ), f"Trace back test failed with {P} {T} at {end}"
+                    assert dtw.warping_path(end) == pm_warping_path(
+                        ldtw, end + 1
+                    ), f"Warping path test failed with {P} {T} at {end}"
+    update_progress(1)
+    print(f"We performed {nb_tests} alignment tests, all passed !")
+
+
+def cell_validation(nb_tests, size_min, bound_homopol):
+    """Compares every cell given by DtwByBlocks.values_at (and value_at) with the
+    saturated PM_DTW matrix, including cells of saturated (skipped) blocks"""
+    nb_skipped = 0
+    for i in range(nb_tests):
+        update_progress(i / float(nb_tests))
+        P = get_random_string(random.randint(1, size_min), bound_homopol)
+        T = get_random_string(size_min, bound_homopol)
+        matrix = PM_DTW(P, T).matrix
+        cells = [(x, y) for x in range(len(P)) for y in range(len(T))]
+        for max_value in (1, len(P) // 4 + 1, sys.maxsize):
+            for cut_intervals in (False, True):
+                dtw = DtwByBlocks(P, T, max_value, cut_intervals)
+                nb_skipped += dtw.get_nb_skipped_blocks()
+                expected = [min(matrix[x + 1][y + 1], max_value) for x, y in cells]
+                assert (
+                    dtw.values_at(cells) == expected
+                ), f"Test failed with {P} {T} max_value {max_value}"
+                line, column = random.choice(cells)
+                assert dtw.value_at(line, column) == expected[cells.index((line, column))]
+    update_progress(1)
+    print(f"We performed {nb_tests} cell tests, {nb_skipped} skipped blocks, all passed !")
+
+
+def deepening_validation(nb_tests, size_min, bound_homopol):
+    """Compares DtwByBlocks.iterative_deepening, from small first max_value, with PM_DTW
+    for both targets, and checks that blocks of the previous computations are reused"""
+    nb_reused = 0
+    for i in range(nb_tests):
+        update_progress(i / float(nb_tests))
+        P = get_random_string(random.randint(1, size_min), bound_homopol)
+        T = get_random_string(size_min, bound_homopol)
+        ldtw = PM_DTW(P, T)
+        last_row = ldtw.get_last_row()[1:]
+        best_value = min(last_row)
+        for max_value in (1, 2, 3):
+            dtw = DtwByBlocks.iterative_deepening(P, T, max_value)
+            assert (
+                dtw.get_br_value() == ldtw.get_last_value()
+            ), f"br test failed with {P} {T} max_value {max_value}"
+            nb_reused += dtw.nb_reused_blocks
+            dtw = DtwByBlocks.iterative_deepening(
+                P, T, max_value, target="best_occurrence"
+            )
+            assert dtw.best_occurrence() == (
+                best_value,
+                last_row.index(best_value),
+            ), f"best occurrence test failed with {P} {T} max_value {max_value}"
+            # the reused blocks give the same values as a computation from scratch
+            scratch = DtwByBlocks(P, T, dtw.max_value)
+            assert (
+                dtw.get_last_row() == scratch.get_last_row()
+            ), f"Reused blocks test failed with {P} {T} max_value {max_value}"
+            nb_reused += dtw.nb_reused_blocks
+    update_progress(1)
+    assert nb_reused > 0, "No block was reused"
+    print(
+        f"We performed {nb_tests} iterative deepening tests, {nb_reused} reused blocks, all passed !"
+    )
+
+
+def brute_force_top_k(P, contigs, k, max_value, min_distance):
+    """k best hits of top_k_hits from the exhaustive PM_DTW hits of each contig
+
+    Hits of each contig are suppressed greedily (by increasing distance, then
+    position), the remaining hits of all contigs are merged by increasing
+    distance, then contig, then position.
+    """
+    hits = []
+    for contig_id, (name, sequence) in enumerate(contigs):
+        if len(sequence) == 0:
+            continue
+        last_row = PM_DTW(P, sequence, mode="last_row").get_last_row()[1:]
+        candidates = sorted(
+            (distance, position)
+            for position, distance in enumerate(last_row)
+            if distance < max_value
+        )
+        accepted = []
+        for distance, position in candidates:
+            if all(abs(position - end) >= min_distance for _, _, end, _ in accepted):
+                accepted.append((distance, contig_id, position, name))
+        hits += accepted
+    hits.sort()
+    return [(name, position, distance) for distance, _, position, name in hits[:k]]
+
+
+def top_k_validation(nb_tests, size_min, bound_homopol):
+    """Compares top_k_hits (shrinking max_value) with a brute force search"""
+    for i in range(nb_tests):
+        update_progress(i / float(nb_tests))
+        P = get_random_string(random.randint(1, size_min // 4 + 1), bound_homopol)
+        contigs = [
+            (f"contig_{c}", get_random_string(random.randint(0, size_min), bound_homopol))
+            for c in range(random.randint(1, 6))
+        ]
+        for k in (1, 3, 10):
+            for max_value in (len(P) // 4 + 1, sys.maxsize):
+                for min_distance in (1, len(P)):
+                    hits = top_k_hits(P, contigs, k, max_value, min_distance)
+                    expected = brute_force_top_k(P, contigs, k, max_value, min_distance)
+                    assert (
+                        hits == expected
+                    ), f"Test failed with {P} {contigs} k {k} max_value {max_value}"
+    update_progress(1)
+    print(f"We performed {nb_tests} top k tests, all passed !")
+
+
+def wavefront_validation(nb_tests, size_min, bound_homopol):
+    """Compares the bottom right value of WavefrontDtwByBlocks with the one of DtwByBlocks,
+    for every executor, with tiles of 1, 2 and more runs than P and T"""
+    for i in range(nb_tests):
+        update_progress(i / float(nb_tests))
+        P = get_random_string(random.randint(1, size_min), bound_homopol)
+        T = get_random_string(size_min, bound_homopol)
+        # a tile of more runs than P and T is the whole matrix
+        nb_runs = max(len(P), len(T)) + 1
+        tile_sizes = ((1, 1), (2, 2), (1, 2), (nb_runs, nb_runs))
+        for max_value in (len(P) // 4 + 1, sys.maxsize):
+            for cut_intervals in (False, True):
+                expected = DtwByBlocks(
+                    P, T, max_value, cut_intervals=cut_intervals
+                ).get_br_value()
+                for executor in executors:
+                    for tile_height, tile_width in tile_sizes:
+                        dtw = WavefrontDtwByBlocks(
+                            P,
+                            T,
+                            max_value,
+                            cut_intervals,
+                            tile_height,
+                            tile_width,
+                            executor,
+                            workers=2,
+                        )
+                        assert (
+                            dtw.get_br_value() == expected
+                        ), f"Test failed with {P} {T} max_value {max_value} {executor} tiles {tile_height}x{tile_width}"
+    update_progress(1)
+    print(f"We performed {nb_tests} wavefront tests, all passed !")
+
+
+def fused_validation(nb_tests, size_min, bound_homopol):
+    """Compares the (value, column, start) of search_dtw_ed with the ones of PM_DTW and PM_ED
+    (min_last_row_val_index and compute_origin_min_position), on a small alphabet to get ties"""
+    for i in range(nb_tests):
+        update_progress(i / float(nb_tests))
+        for homopol in (1, bound_homopol):
+            P = get_random_string(random.randint(1, size_min), homopol)
+            T = get_random_string(size_min, homopol)
+            for text in (T, dp_compiled.CompiledText(T)):
+                results = search_dtw_ed(P, text)
+                for PM, (value, column, start) in zip((PM_DTW, PM_ED), results):
+                    matrix = PM(P, T)
+                    expected = matrix.min_last_row_val_index()
+                    assert (
+                        value,
+                        column,
+                    ) == expected, f"{PM.__name__} value test failed with {P} {T}"
+                    expected_start, _, _ = matrix.compute_origin_min_position()
+                    assert (
+                        start == expected_start
+                    ), f"{PM.__name__} start test failed with {P} {T}"
+    update_progress(1)
+    print(f"We performed {nb_tests} fused tests, all passed !")
+
+
+def lower_bounds_validation(nb_tests, size_min, bound_homopol):
+    """Checks that every stage of the cascade is a lower bound of the PM_DTW distance
+    (equal to it when exact), that LowerBoundCascade.distance is the saturated distance
+    for every engine, and that the cascade does not change the distances computed on
+    the candidate windows of an index (read_generator --index)"""
+    nb_windows = 0
+    for i in range(nb_tests):
+        update_progress(i / float(nb_tests))
+        for homopol in (1, bound_homopol):
+            P = get_random_string(random.randint(1, size_min), homopol)
+            T = get_random_string(size_min, homopol)
+            distance = PM_DTW(P, T).min_last_row_val_index()[0]
+            for name, stage in default_stages:
+                bound, exact = stage(P, T)
+                assert bound <= distance, f"{name} test failed with {P} {T}"
+                assert (
+                    not exact or bound == distance
+                ), f"{name} exact test failed with {P} {T}"
+            for engine in exact_engines:
+                cascade = LowerBoundCascade(engine=engine)
+                for max_value in (1, 2, 3, len(P) // 4 + 1, sys.maxsize):
+                    assert cascade.distance(P, T, max_value) == min(
+                        distance, max_value
+                    ), f"{engine} cascade test failed with {P} {T} max_value {max_value}"
+
+        # reads of a genome (of nucleotides, see hpc_index.kmer_hashes), aligned on
+        # the candidate windows of its index
+        G = get_random_string(10 * size_min, bound_homopol)
+        G = G.translate(str.maketrans("abcd", "ACGT"))
+        index = HPCIndex(G, k=5, w=4, margin=4)
+        start = random.randint(0, len(G) - size_min)
+        R, _, _, _ = add_seq_err(G[start : start + size_min], Error_rate(0.2))
+        nb_windows += len(index.candidate_windows(R))
+        for max_value in (len(R) // 4 + 1, len(R) + 1):
+            expected = evaluate_dtw_ed(
+                R, G, start, "", "", "", "blocks", index, max_value
+            )
+            for engine in exact_engines:
+                cascade = LowerBoundCascade(engine=engine)
+                assert (
+                    evaluate_dtw_ed(
+                        R, G, start, "", "", "", "blocks", index, max_value, cascade
+                    )
+                    == expected
+                ), f"{engine} index test failed with {R} {G} max_value {max_value}"
+    update_progress(1)
+    assert nb_windows > 0, "No candidate window"
+    print(
+        f"We performed {nb_tests} lower bound tests, {nb_windows} candidate windows, all passed !"
+    )
+
+
+def serial_search(P, T, engine, max_value):
+    """Best occurrence of P in T by the compiled search of an engine of batch"""
+    if engine == "block":
+        return block_compiled.search(P, RunLengthSequence.from_string(T), max_value)
+    value, column = dp_compiled.search(
+        P, dp_compiled.CompiledText(T), engine, max_value
+    )
+    return value, column - 1
+
+
+def batch_validation(nb_tests, size_min, bound_homopol):
+    """Compares search_many and search_pairs of batch (2 processes, chunks smaller than
+    the number of patterns) with the serial search of each pattern, for every engine"""
+    for i in range(nb_tests):
+        update_progress(i / float(nb_tests))
+        T = get_random_string(size_min, bound_homopol)
+        patterns = [
+            get_random_string(random.randint(1, size_min // 2 + 1), bound_homopol)
+            for _ in range(10)
+        ]
+        pairs = [(P, get_random_string(size_min, bound_homopol)) for P in patterns]
+        for engine in batch.engines:
+            for max_value in (size_min // 8 + 1, sys.maxsize):
+                results = batch.search_many(
+                    patterns, T, engine, max_value, processes=2, chunksize=3
+                )
+                assert list(results) == [
+                    serial_search(P, T, engine, max_value) for P in patterns
+                ], f"search_many {engine} test failed with {T} {patterns} max_value {max_value}"
+                results = batch.search_pairs(
+                    pairs, engine, max_value, processes=2, chunksize=3
+                )
+                assert list(results) == [
+                    serial_search(P, text, engine, max_value) for P, text in pairs
+                ], f"search_pairs {engine} test failed with {pairs} max_value {max_value}"
+    update_progress(1)
+    print(f"We performed {nb_tests} batch tests, all passed !")
+
+
+def random_runs(size_min, bound_homopol):
+    """Random (letters, lengths) of at least size_min letters, two consecutive runs
+    having sometimes the same letter, lengths as a list or an array('I')"""
+    letters = []
+    lengths = []
+    while sum(lengths) < size_min:
+        letters.append(chr(random.randint(97, 100)))
+        lengths.append(random.randint(1, bound_homopol))
+    if random.random() < 0.5:
+        lengths = array("I", lengths)
+    return "".join(letters), lengths
+
+
+def rle_validation(nb_tests, size_min, bound_homopol):
+    """Compares DtwByBlocks.from_rle with DtwByBlocks on the decoded strings"""
+    for i in range(nb_tests):
+        update_progress(i / float(nb_tests))
+        P_letters, P_lengths = random_runs(random.randint(1, size_min), bound_homopol)
+        T_letters, T_lengths = random_runs(size_min, bound_homopol)
+        P = RunLengthSequence(P_letters, P_lengths).decode()
+        T = RunLengthSequence(T_letters, T_lengths).decode()
+        for max_value in (len(P) // 4 + 1, sys.maxsize):
+            for mode in ("matrix", "last_row"):
+                dtw = DtwByBlocks.from_rle(
+                    P_letters,
+                    P_lengths,
+                    T_letters,
+                    T_lengths,
+                    max_value=max_value,
+                    mode=mode,
+                )
+                expected = DtwByBlocks(P, T, max_value, mode=mode)
+                assert (
+                    dtw.get_br_value() == expected.get_br_value()
+                ), f"br test failed with {P_letters} {list(P_lengths)} {T_letters} {list(T_lengths)}"
+                assert (
+                    dtw.get_last_row() == expected.get_last_row()
+                ), f"Last row test failed with {P_letters} {list(P_lengths)} {T_letters} {list(T_lengths)}"
+    update_progress(1)
+    print(f"We performed {nb_tests} run-length encoded tests, all passed !")
+
+
+validations = {
+    "global": global_validation,
+    "ed": ed_validation,
+    "streaming": streaming_validation,
+    "bitparallel": bitparallel_validation,
+    "bounded": bounded_validation,
+    "numpy": numpy_validation,
+    "traceback": traceback_validation,
+    "alignments": alignment_validation,
+    "cells": cell_validation,
+    "deepening": deepening_validation,
+    "top_k": top_k_validation,
+    "wavefront": wavefront_validation,
+    "fused": fused_validation,
+    "lower_bounds": lower_bounds_validation,
+    "batch": batch_validation,
+    "rle": rle_validation,
+}
+
+
 if __name__ == "__main__":
 
-    if len(sys.argv) != 4:
+    if len(sys.argv) == 3 and sys.argv[1] == "blocks":
+        block_benchmark(nb_tests=int(sys.argv[2]))
+    elif len(sys.argv) == 5 and sys.argv[1] in validations:
+        validations[sys.argv[1]](
+            nb_tests=int(sys.argv[2]),
+            size_min=int(sys.argv[3]),
+            bound_homopol=int(sys.argv[4]),
+        )
+    elif len(sys.argv) != 4:
         sys.stderr.write(
             f"Usage: python {sys.argv[0]} nb_tests min_size_P_T homopol_size_bound\n"
         )
+        sys.stderr.write(f"   or: python {sys.argv[0]} blocks nb_tests\n")
+        sys.stderr.write(
+            f"   or: python {sys.argv[0]} {'|'.join(validations)} nb_tests min_size_P_T homopol_size_bound\n"
+        )
     else:
         main(
             nb_tests=int(sys.argv[1]),